@@ -1,40 +1,227 @@
-import cv2
+import argparse
+import logging
 from src.utils.logger import logger
 from src.config.config_manager import ConfigManager
-from src.camera.rtsp_client import RTSPClient
-from src.utils.image_processor import ImageProcessor
-from src.utils.monitor import HealthCheck
+from src.core.capture_engine import CaptureEngine
+from src.core.snapshot_service import SnapshotService, create_snapshot_server
+from src.core.load_generator import run_load_test
+from src.core.sharding import ShardPlan, node_names
+from src.models.camera_models import VirtualCameraSpec
+from src.camera.health_prober import HealthCache, HealthProber
+from src.utils.encode_cache import EncodedImageCache
+from src.utils.monitor import dwell_time_histograms
+from src.utils.run_stats import CaptureRunStats
+from src.utils.tracing import tracer
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="IPC camera image capture tool")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the snapshot HTTP service instead of a one-shot capture")
+
+    load = parser.add_argument_group("load testing")
+    load.add_argument("--load-test", type=int, metavar="N",
+                      help="drive the capture path with N virtual cameras instead of real ones")
+    load.add_argument("--duration", type=float, default=10.0, help="load-test duration in seconds")
+    load.add_argument("--workers", type=int, default=8, help="concurrent capture threads")
+    load.add_argument("--resolution", default="1920x1080", help="synthetic frame size, WIDTHxHEIGHT")
+    load.add_argument("--fps", type=float, default=25.0, help="virtual stream frame rate")
+    load.add_argument("--source", help="play this video file instead of synthetic frames")
+    load.add_argument("--connect-delay-ms", type=float, default=0.0, help="simulated connect latency")
+    load.add_argument("--auth-failure-rate", type=float, default=0.0, help="probability a connect is rejected")
+    load.add_argument("--drop-rate", type=float, default=0.0, help="per-frame probability the stream drops")
+    load.add_argument("--corrupt-rate", type=float, default=0.0, help="per-frame probability of a corrupt frame")
+    load.add_argument("--seed", type=int, help="seed for fault injection, so a run can be reproduced")
+    load.add_argument("--output-dir", default="output/loadtest", help="where load-test images are written")
+    load.add_argument("--stats-dump", metavar="PATH",
+                      help="write columnar run statistics to PATH.npz and PATH_summary.csv, "
+                           "and state dwell times to PATH_dwell.json")
+
+    shard = parser.add_argument_group("sharding")
+    shard.add_argument("--node-index", type=int, help="index of this node (with --node-count)")
+    shard.add_argument("--node-count", type=int, help="number of nodes sharing the cameras")
+    shard.add_argument("--nodes", help="comma-separated node names (instead of --node-count)")
+    shard.add_argument("--node-name", help="name of this node (with --nodes)")
+    shard.add_argument("--load-factor", type=float, default=1.25,
+                       help="max decode cost per node relative to its fair share; 0 for plain rendezvous")
+    shard.add_argument("--plan", action="store_true",
+                       help="print the assignment plan and expected load per node, then exit")
+    shard.add_argument("--show-cameras", action="store_true", help="list the cameras of each node in --plan")
+
+    args = parser.parse_args()
+    if args.node_count is not None:
+        if args.nodes:
+            parser.error("use either --node-count or --nodes, not both")
+        if args.node_count < 1:
+            parser.error("--node-count must be at least 1")
+        if args.node_index is not None and not 0 <= args.node_index < args.node_count:
+            parser.error("--node-index must be in [0, --node-count)")
+    elif args.node_index is not None:
+        parser.error("--node-index requires --node-count")
+    if args.node_name and not args.nodes:
+        parser.error("--node-name requires --nodes")
+    if args.nodes and args.node_name and args.node_name not in args.nodes.split(","):
+        parser.error(f"--node-name {args.node_name!r} is not in --nodes")
+    if not args.plan:
+        if args.node_count is not None and args.node_index is None:
+            parser.error("--node-count requires this node's --node-index (or use --plan)")
+        if args.nodes and not args.node_name:
+            parser.error("--nodes requires this node's --node-name (or use --plan)")
+    if args.load_factor < 0 or 0 < args.load_factor < 1:
+        parser.error("--load-factor must be at least 1, or 0 for plain rendezvous")
+    return args
+
+def build_shard_plan(args, camera_configs):
+    """
+    Returns (plan, this node's name), or (None, None) when sharding is not configured.
+    """
+    if args.nodes:
+        nodes, node_id = args.nodes.split(","), args.node_name
+    elif args.node_count:
+        nodes = node_names(args.node_count)
+        node_id = nodes[args.node_index] if args.node_index is not None else None
+    else:
+        return None, None
+    plan = ShardPlan.build(camera_configs, nodes, load_factor=args.load_factor or None)
+    return plan, node_id
+
+def load_test(args):
+    """
+    Runs a load test against virtual cameras and prints the report.
+    """
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    spec = VirtualCameraSpec(
+        width=width,
+        height=height,
+        fps=args.fps,
+        source=args.source,
+        connect_delay_ms=args.connect_delay_ms,
+        auth_failure_rate=args.auth_failure_rate,
+        drop_rate=args.drop_rate,
+        corrupt_rate=args.corrupt_rate,
+        seed=args.seed,
+    )
+    # Per-capture INFO logging would dominate the measurement; keep warnings only.
+    logger.setLevel(logging.WARNING)
+    report = run_load_test(
+        args.load_test, spec, duration_s=args.duration, workers=args.workers, output_dir=args.output_dir,
+        run_stats=CaptureRunStats(dump_path=args.stats_dump),
+    )
+    print(report.format())
+    report.run_stats.dump()
+    report_dwell_times(args.stats_dump)
+
+def report_dwell_times(dump_path=None):
+    """
+    Logs how long each camera spent in each capture state, and writes the
+    histograms to '<dump_path>_dwell.json' when a dump path is configured.
+    """
+    summary = dwell_time_histograms.format()
+    if summary:
+        logger.info(f"State dwell times:\n{summary}")
+    if dump_path:
+        dwell_time_histograms.save_json(f"{dump_path}_dwell.json")
+
+def serve(config_manager, camera_configs):
+    """
+    Runs the snapshot HTTP service until interrupted.
+    """
+    server_config = config_manager.get_server_config()
+    cache = EncodedImageCache(
+        max_bytes=server_config.get('cache_max_bytes', 64 * 1024 * 1024),
+        max_age_seconds=server_config.get('cache_max_age_seconds', 60),
+    )
+    service = SnapshotService(camera_configs, jpeg_quality=server_config.get('jpeg_quality', 90), cache=cache)
+    server = create_snapshot_server(
+        service,
+        host=server_config.get('host', '127.0.0.1'),
+        port=server_config.get('port', 8080),
+    )
+    logger.info(f"Snapshot service listening on {server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Snapshot service stopping...")
+    finally:
+        server.server_close()
+        service.close()
 
 def main():
     """
     Main function to run the application.
     """
+    args = parse_args()
     logger.info("Application starting...")
 
     try:
         # Manually create a ConfigManager instance
         config_manager = ConfigManager()
-        camera_config = config_manager.get_camera_config()
-
-        with RTSPClient(camera_config) as client:
-            # Perform a health check before capturing
-            if HealthCheck.check_camera_status(client):
-                frame = client.capture_frame()
-                if frame is not None:
-                    # Use ImageProcessor to save the frame
-                    ImageProcessor.save_image(
-                        frame=frame,
-                        camera_id=camera_config.camera_id
-                    )
-                else:
-                    logger.error("Failed to capture frame.")
+
+        tracing_config = config_manager.get_tracing_config()
+        if tracing_config.get('file'):
+            tracer.configure(
+                file_path=tracing_config['file'],
+                sample_rate=tracing_config.get('sample_rate', 1.0),
+                slow_trace_ms=tracing_config.get('slow_trace_ms'),
+            )
+
+        if args.load_test:
+            load_test(args)
+            return
+
+        camera_configs = config_manager.get_camera_configs()
+
+        plan, node_id = build_shard_plan(args, camera_configs)
+        if args.plan:
+            if plan is None:
+                plan = ShardPlan.build(camera_configs, node_names(1), load_factor=None)
+            print(plan.format(show_cameras=args.show_cameras))
+            return
+        if plan is not None:
+            mine = set(plan.cameras_for(node_id))
+            camera_configs = [config for config in camera_configs if config.camera_id in mine]
+            logger.info(f"Node {node_id} owns {len(camera_configs)} of {len(plan.assignment)} cameras")
+
+        if args.serve:
+            serve(config_manager, camera_configs)
+            return
+
+        # Probe the whole fleet cheaply first so that cameras known to be down are skipped.
+        health_cache = None
+        health_config = config_manager.get_health_config()
+        if health_config:
+            health_cache = HealthCache(ttl_seconds=health_config.get('ttl_seconds', 30))
+            HealthProber(
+                timeout=health_config.get('timeout', 2.0),
+                max_concurrency=health_config.get('max_concurrency', 256),
+                cache=health_cache,
+            ).probe(camera_configs)
+
+        stats_config = config_manager.get_stats_config()
+        run_stats = CaptureRunStats(
+            dump_path=stats_config.get('dump_path'),
+            dump_interval_s=stats_config.get('dump_interval_s', 60),
+        )
+
+        for camera_config in camera_configs:
+            engine = CaptureEngine(
+                camera_config, health_cache=health_cache, run_stats=run_stats, node_id=node_id
+            )
+            result = engine.capture_image()
+            if result.success:
+                logger.info(
+                    f"[{camera_config.camera_id}] Capture succeeded in {result.execution_time_ms:.2f} ms: "
+                    f"{result.image_info.file_path}"
+                )
             else:
-                logger.error("Health check failed. Could not connect to the camera.")
+                logger.error(f"[{camera_config.camera_id}] Capture failed: {result.error_message}")
+
+        run_stats.dump()
+        report_dwell_times(stats_config.get('dump_path'))
 
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
-
-    logger.info("Application finished.")
+    finally:
+        logger.info("Application finished.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,382 @@
+"""
+A lightweight, protocol-level health prober for a fleet of cameras.
+
+Instead of opening a full `VideoCapture` per camera, the prober speaks just enough
+RTSP (OPTIONS, then DESCRIBE with Basic/Digest authentication) or HTTP (HEAD) to
+tell whether a camera is up, how long it takes to answer and whether it accepts
+our credentials. All probes run concurrently over non-blocking sockets driven by
+a single `selectors` loop in the calling thread. Camera addresses are resolved
+before the loop starts, because name lookups block.
+
+Results are stored in a `HealthCache` with a TTL, which the capture engine can
+consult to skip cameras that are known to be down.
+"""
+
+import base64
+import errno
+import hashlib
+import os
+import re
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Union
+
+from src.models.camera_models import CameraConfig, ProbeResult
+from src.utils.logger import logger
+
+
+class HealthCache:
+    """
+    A thread-safe TTL cache of the latest ProbeResult per camera.
+    """
+    def __init__(self, ttl_seconds: float = 30.0, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._results: Dict[str, ProbeResult] = {}
+        self._lock = threading.Lock()
+
+    def put(self, result: ProbeResult):
+        with self._lock:
+            self._results[result.camera_id] = result
+
+    def get(self, camera_id: str) -> Optional[ProbeResult]:
+        """Returns the cached result for `camera_id`, or None if missing or expired."""
+        with self._lock:
+            result = self._results.get(camera_id)
+            if result is None:
+                return None
+            if self._clock() - result.checked_at > self.ttl_seconds:
+                del self._results[camera_id]
+                return None
+            return result
+
+    def is_known_down(self, camera_id: str) -> bool:
+        """True only if a fresh probe result says the camera is unhealthy."""
+        result = self.get(camera_id)
+        return result is not None and not result.is_healthy
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+def _md5(text: str) -> str:
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def _parse_challenge(header: str) -> Dict[str, str]:
+    """Parses the parameters of a WWW-Authenticate challenge."""
+    return {k.lower(): v1 or v2 for k, v1, v2 in re.findall(r'(\w+)=(?:"([^"]*)"|([^\s,]+))', header)}
+
+
+def build_authorization(challenges: List[str], method: str, uri: str, username: str, password: str) -> Optional[str]:
+    """
+    Builds an Authorization header answering one of the given WWW-Authenticate
+    challenges. Digest is preferred over Basic.
+
+    Returns:
+        The header value, or None if no supported scheme was offered.
+    """
+    for challenge in challenges:
+        if challenge.lower().startswith("digest"):
+            params = _parse_challenge(challenge)
+            realm, nonce = params.get("realm", ""), params.get("nonce", "")
+            ha1 = _md5(f"{username}:{realm}:{password}")
+            ha2 = _md5(f"{method}:{uri}")
+            qop = params.get("qop")
+            if qop and "auth" in [q.strip() for q in qop.split(",")]:
+                nc, cnonce = "00000001", os.urandom(8).hex()
+                response = _md5(f"{ha1}:{nonce}:{nc}:{cnonce}:auth:{ha2}")
+                extra = f', qop=auth, nc={nc}, cnonce="{cnonce}"'
+            else:
+                response = _md5(f"{ha1}:{nonce}:{ha2}")
+                extra = ""
+            header = (
+                f'Digest username="{username}", realm="{realm}", nonce="{nonce}", '
+                f'uri="{uri}", response="{response}"{extra}'
+            )
+            if "opaque" in params:
+                header += f', opaque="{params["opaque"]}"'
+            return header
+    for challenge in challenges:
+        if challenge.lower().startswith("basic"):
+            return "Basic " + base64.b64encode(f"{username}:{password}".encode("utf-8")).decode("ascii")
+    return None
+
+
+class _Response:
+    """A parsed RTSP/HTTP response."""
+    def __init__(self, status_code: int, headers: List[tuple]):
+        self.status_code = status_code
+        self.headers = headers
+
+    def get_all(self, name: str) -> List[str]:
+        name = name.lower()
+        return [value for key, value in self.headers if key == name]
+
+
+def _parse_head(raw: bytes) -> _Response:
+    lines = raw.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith(("RTSP/", "HTTP/")):
+        raise ValueError(f"Malformed status line: {lines[0]!r}")
+    headers = []
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers.append((key.strip().lower(), value.strip()))
+    return _Response(int(parts[1]), headers)
+
+
+class _Probe:
+    """
+    Per-camera probe state: the socket, its buffers and the request sequence.
+    """
+    def __init__(self, config: CameraConfig, deadline: float):
+        self.config = config
+        self.deadline = deadline
+        self.sock: Optional[socket.socket] = None
+        self.connected = False
+        self.out_buffer = b""
+        self.in_buffer = b""
+        self.sent_at = 0.0
+        self.cseq = 0
+        self.method = ""
+        # The method whose challenge has been answered; a second 401 for it means the credentials are wrong.
+        self.authorized_method: Optional[str] = None
+        self.result = ProbeResult(camera_id=config.camera_id, reachable=False)
+
+    @property
+    def is_http(self) -> bool:
+        return self.config.protocol.lower() == "http"
+
+    @property
+    def authority(self) -> str:
+        host = f"[{self.config.ip}]" if ":" in self.config.ip else self.config.ip
+        return f"{host}:{self.config.port}"
+
+    @property
+    def uri(self) -> str:
+        if self.is_http:
+            return "/" + self.config.rtsp_path.lstrip("/")
+        return f"rtsp://{self.authority}/{self.config.rtsp_path}"
+
+    def queue_request(self, method: str, authorization: Optional[str] = None):
+        self.method = method
+        self.cseq += 1
+        if self.is_http:
+            lines = [f"{method} {self.uri} HTTP/1.1", f"Host: {self.authority}"]
+        else:
+            lines = [f"{method} {self.uri} RTSP/1.0", f"CSeq: {self.cseq}"]
+            if method == "DESCRIBE":
+                lines.append("Accept: application/sdp")
+        lines.append("User-Agent: simple_ai-health-prober")
+        if authorization:
+            lines.append(f"Authorization: {authorization}")
+        self.out_buffer = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def take_response(self) -> Optional[_Response]:
+        """Returns a complete response (consuming it from the buffer), or None."""
+        head_end = self.in_buffer.find(b"\r\n\r\n")
+        if head_end < 0:
+            return None
+        response = _parse_head(self.in_buffer[:head_end])
+        # HEAD responses never carry a body, whatever Content-Length says.
+        length = 0 if self.method == "HEAD" else int((response.get_all("content-length") or ["0"])[0])
+        total = head_end + 4 + length
+        if len(self.in_buffer) < total:
+            return None
+        self.in_buffer = self.in_buffer[total:]
+        return response
+
+
+class HealthProber:
+    """
+    Probes many cameras concurrently from a single thread.
+
+    Attributes:
+        timeout (float): Per-camera time budget in seconds for the whole exchange.
+        max_concurrency (int): Maximum number of sockets open at once.
+        cache (HealthCache): Where results are stored after each probe.
+    """
+    def __init__(self, timeout: float = 2.0, max_concurrency: int = 256, cache: Optional[HealthCache] = None,
+                 clock=time.monotonic):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.cache = cache if cache is not None else HealthCache()
+        self._clock = clock
+
+    def probe(self, configs: Iterable[CameraConfig]) -> Dict[str, ProbeResult]:
+        """
+        Probes every camera and returns {camera_id: ProbeResult}.
+        Results are also written to the cache.
+        """
+        pending = deque(configs)
+        addresses = self._resolve(pending)
+        results: Dict[str, ProbeResult] = {}
+        selector = selectors.DefaultSelector()
+        active = 0
+        try:
+            while pending or active:
+                while pending and active < self.max_concurrency:
+                    config = pending.popleft()
+                    probe = self._start(config, addresses[(config.ip, config.port)], selector)
+                    if probe.sock is None:
+                        self._finish(probe, selector, results)
+                    else:
+                        active += 1
+
+                now = self._clock()
+                open_probes = [key.data for key in selector.get_map().values()]
+                wait = max(0.0, min(p.deadline for p in open_probes) - now) if open_probes else 0.0
+                for key, mask in selector.select(timeout=wait):
+                    probe = key.data
+                    if self._handle(probe, mask, selector):
+                        self._finish(probe, selector, results)
+                        active -= 1
+
+                now = self._clock()
+                for probe in [key.data for key in selector.get_map().values()]:
+                    if now >= probe.deadline:
+                        probe.result.error = probe.result.error or "Timed out"
+                        self._finish(probe, selector, results)
+                        active -= 1
+        finally:
+            for key in list(selector.get_map().values()):
+                key.data.sock.close()
+            selector.close()
+
+        healthy = sum(1 for r in results.values() if r.is_healthy)
+        logger.info(f"Health probe finished: {healthy}/{len(results)} cameras healthy")
+        return results
+
+    @staticmethod
+    def _resolve(configs: Iterable[CameraConfig]) -> Dict[tuple, Union[tuple, OSError]]:
+        """
+        Resolves each distinct (ip, port) once, before any probe starts, so that
+        getaddrinfo never blocks the selector loop. IP literals resolve without a
+        lookup, and the address family (IPv4 or IPv6) comes from the result.
+
+        Returns:
+            {(ip, port): (family, sockaddr)}, or the OSError if resolution failed.
+        """
+        addresses = {}
+        for config in configs:
+            key = (config.ip, config.port)
+            if key in addresses:
+                continue
+            try:
+                family, _, _, _, sockaddr = socket.getaddrinfo(config.ip, config.port, type=socket.SOCK_STREAM)[0]
+                addresses[key] = (family, sockaddr)
+            except OSError as e:
+                addresses[key] = e
+        return addresses
+
+    def _start(self, config: CameraConfig, address: Union[tuple, OSError], selector) -> _Probe:
+        probe = _Probe(config, self._clock() + self.timeout)
+        probe.queue_request("HEAD" if probe.is_http else "OPTIONS")
+        if isinstance(address, OSError):
+            probe.result.error = f"Resolve failed: {address}"
+            return probe
+        family, sockaddr = address
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            code = sock.connect_ex(sockaddr)
+        except OSError as e:
+            probe.result.error = f"Connect failed: {e}"
+            return probe
+        if code not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            sock.close()
+            probe.result.error = f"Connect failed: {os.strerror(code)}"
+            return probe
+        probe.sock = sock
+        selector.register(sock, selectors.EVENT_WRITE, probe)
+        return probe
+
+    def _handle(self, probe: _Probe, mask: int, selector) -> bool:
+        """Advances one probe. Returns True when the probe is finished."""
+        try:
+            if not probe.connected:
+                code = probe.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if code:
+                    probe.result.error = f"Connect failed: {os.strerror(code)}"
+                    return True
+                probe.connected = True
+
+            if mask & selectors.EVENT_WRITE and probe.out_buffer:
+                if not probe.sent_at:
+                    probe.sent_at = self._clock()
+                sent = probe.sock.send(probe.out_buffer)
+                probe.out_buffer = probe.out_buffer[sent:]
+                if not probe.out_buffer:
+                    selector.modify(probe.sock, selectors.EVENT_READ, probe)
+                return False
+
+            if mask & selectors.EVENT_READ:
+                chunk = probe.sock.recv(4096)
+                if not chunk:
+                    probe.result.error = probe.result.error or "Connection closed by camera"
+                    return True
+                probe.in_buffer += chunk
+                response = probe.take_response()
+                if response is None:
+                    return False
+                return self._on_response(probe, response, selector)
+        except (OSError, ValueError) as e:
+            probe.result.error = str(e)
+            return True
+        return False
+
+    def _on_response(self, probe: _Probe, response: _Response, selector) -> bool:
+        result = probe.result
+        result.reachable = True
+        result.status_code = response.status_code
+        if result.rtt_ms is None:
+            result.rtt_ms = (self._clock() - probe.sent_at) * 1000
+
+        if response.status_code == 401:
+            challenges = response.get_all("www-authenticate")
+            method = probe.method
+            if probe.authorized_method == method or not challenges:
+                result.auth_ok = False
+                return True
+            authorization = build_authorization(
+                challenges, method, probe.uri, probe.config.username, probe.config.password
+            )
+            if authorization is None:
+                result.error = "Unsupported authentication scheme"
+                return True
+            probe.authorized_method = method
+            return self._send(probe, method, selector, authorization)
+
+        if response.status_code == 403:
+            result.auth_ok = False
+            return True
+
+        if probe.method == "OPTIONS":
+            # OPTIONS is usually unauthenticated; DESCRIBE tells us whether credentials work.
+            return self._send(probe, "DESCRIBE", selector)
+
+        if 200 <= response.status_code < 300:
+            result.auth_ok = True
+        else:
+            result.error = f"Unexpected status {response.status_code}"
+        return True
+
+    @staticmethod
+    def _send(probe: _Probe, method: str, selector, authorization: Optional[str] = None) -> bool:
+        probe.queue_request(method, authorization)
+        selector.modify(probe.sock, selectors.EVENT_WRITE, probe)
+        return False
+
+    def _finish(self, probe: _Probe, selector, results: Dict[str, ProbeResult]):
+        if probe.sock is not None:
+            selector.unregister(probe.sock)
+            probe.sock.close()
+        probe.result.checked_at = self._clock()
+        results[probe.config.camera_id] = probe.result
+        self.cache.put(probe.result)
@@ -2,6 +2,7 @@ import cv2
 from src.utils.logger import logger
 from src.models.camera_models import CameraConfig
 from src.utils.monitor import performance_monitor
+from src.utils.tracing import tracer
 import numpy as np
 
 class RTSPClient:
@@ -27,24 +28,29 @@ class RTSPClient:
         Returns True if connection is successful, False otherwise.
         """
         logger.info(f"Attempting to connect to RTSP stream: {self.config.ip}")
-        try:
-            # Using CAP_FFMPEG backend for better compatibility
-            self.cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
-            
-            # Set buffer size to 1 to get the latest frame
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        with tracer.span("connect", camera_id=self.config.camera_id) as span:
+            try:
+                # Using CAP_FFMPEG backend for better compatibility
+                self.cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
+
+                # Set buffer size to 1 to get the latest frame
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
-            if not self.cap.isOpened():
-                logger.error(f"Failed to open RTSP stream at {self.rtsp_url}")
+                if not self.cap.isOpened():
+                    logger.error(f"Failed to open RTSP stream at {self.rtsp_url}")
+                    self.cap = None
+                    if span:
+                        span.status = "error"
+                    return False
+
+                logger.info("Successfully connected to RTSP stream.")
+                return True
+            except Exception as e:
+                logger.error(f"An error occurred while connecting to RTSP stream: {e}")
                 self.cap = None
+                if span:
+                    span.status = "error"
                 return False
-            
-            logger.info("Successfully connected to RTSP stream.")
-            return True
-        except Exception as e:
-            logger.error(f"An error occurred while connecting to RTSP stream: {e}")
-            self.cap = None
-            return False
 
     @performance_monitor
     def capture_frame(self) -> np.ndarray | None:
@@ -57,12 +63,25 @@ class RTSPClient:
             return None
 
         try:
-            # The buffer is cleared and the latest frame is read.
-            ret, frame = self.cap.read()
+            # Time the two halves separately. With FFmpeg, grab() waits for,
+            # demuxes and decodes the next packet ("read"); retrieve() only
+            # converts the decoded picture to BGR ("convert").
+            with tracer.span("read", camera_id=self.config.camera_id) as span:
+                grabbed = self.cap.grab()
+                if not grabbed and span:
+                    span.status = "error"
+            if not grabbed:
+                logger.error("Failed to grab frame from RTSP stream.")
+                return None
+
+            with tracer.span("convert", camera_id=self.config.camera_id) as span:
+                ret, frame = self.cap.retrieve()
+                if (not ret or frame is None) and span:
+                    span.status = "error"
             if not ret or frame is None:
-                logger.error("Failed to read frame from RTSP stream.")
+                logger.error("Failed to retrieve frame from RTSP stream.")
                 return None
-            
+
             logger.info("Successfully captured a frame.")
             return frame
         except Exception as e:
@@ -0,0 +1,224 @@
+"""
+A virtual camera client for load testing.
+
+`VirtualCameraClient` has the same interface as `RTSPClient` (connect,
+capture_frame, disconnect and context-manager support), so it can be passed to
+the capture engine or the snapshot service as a `client_factory`. It plays a
+local video file or generates synthetic frames at a configured resolution and
+frame rate, and can inject faults: slow connects, authentication failures,
+dropped streams and corrupt frames.
+"""
+
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from src.models.camera_models import CameraConfig, VirtualCameraSpec
+from src.utils.logger import logger
+from src.utils.monitor import performance_monitor
+from src.utils.tracing import tracer
+
+
+def _derive_seed(seed: int, camera_id: str, connect_count: int = 0) -> int:
+    """Derives a client's fault-injection seed from the run seed, the camera and its connect count."""
+    return seed + zlib.crc32(f"{camera_id}:{connect_count}".encode())
+
+
+class _SyntheticStream:
+    """Stands in for a VideoCapture so `client.cap.isOpened()` works as with RTSPClient."""
+    def isOpened(self) -> bool:
+        return True
+
+    def release(self):
+        pass
+
+
+class FrameClock:
+    """
+    The frame timeline of one virtual camera, paced at `fps`.
+
+    A real camera keeps producing frames whether or not anyone is connected, so
+    the clock outlives clients: sharing it across reconnects makes the first grab
+    after a connect wait for the next frame boundary, instead of getting a frame
+    immediately.
+    """
+    def __init__(self, fps: float, clock=time.monotonic):
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self._clock = clock
+        self._next_frame_at = clock()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Waits until the next frame is due. A late caller gets one frame immediately, without a burst."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = self._clock()
+            frame_at = max(self._next_frame_at, now - self.interval)
+            self._next_frame_at = frame_at + self.interval
+        delay = frame_at - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class VirtualCameraClient:
+    """
+    A client for a simulated camera stream.
+    """
+    def __init__(self, config: CameraConfig, spec: VirtualCameraSpec | None = None, seed: int | None = None,
+                 frame_clock: FrameClock | None = None):
+        self.config = config
+        self.spec = spec or VirtualCameraSpec()
+        if seed is None and self.spec.seed is not None:
+            seed = _derive_seed(self.spec.seed, config.camera_id)
+        self._random = random.Random(seed)
+        self.frame_clock = frame_clock if frame_clock is not None else FrameClock(self.spec.fps)
+        self.cap = None
+        self.frame_index = 0
+        self._canvas = None
+
+    @performance_monitor
+    def connect(self) -> bool:
+        """
+        Opens the virtual stream, honouring the configured connect delay and auth failure rate.
+        Returns True if connection is successful, False otherwise.
+        """
+        with tracer.span("connect", camera_id=self.config.camera_id, virtual=True) as span:
+            if self.spec.connect_delay_ms:
+                time.sleep(self.spec.connect_delay_ms / 1000)
+
+            if self._random.random() < self.spec.auth_failure_rate:
+                logger.error(f"[{self.config.camera_id}] Virtual camera rejected credentials.")
+                if span:
+                    span.status = "error"
+                return False
+
+            if self.spec.source:
+                self.cap = cv2.VideoCapture(self.spec.source)
+                if not self.cap.isOpened():
+                    logger.error(f"[{self.config.camera_id}] Failed to open video file {self.spec.source}")
+                    self.cap = None
+                    if span:
+                        span.status = "error"
+                    return False
+            else:
+                self.cap = _SyntheticStream()
+                self._canvas = np.zeros((self.spec.height, self.spec.width, 3), dtype=np.uint8)
+
+            return True
+
+    def capture_frame(self) -> np.ndarray | None:
+        """
+        Returns the next frame of the virtual stream, or None if the stream is not
+        open or has dropped. Corrupt frames keep their full size but are garbled
+        (see `_corrupt`), so they go through encode and write like real ones.
+        """
+        if self.cap is None:
+            logger.warning(f"[{self.config.camera_id}] Virtual camera not connected. Cannot capture frame.")
+            return None
+
+        # Waiting for and producing the frame is one "read" span, like RTSPClient's
+        # grab(); there is no separate colour conversion to time.
+        with tracer.span("read", camera_id=self.config.camera_id, virtual=True) as span:
+            if self.spec.realtime:
+                self.frame_clock.wait()
+            if self._random.random() < self.spec.drop_rate:
+                logger.error(f"[{self.config.camera_id}] Virtual stream dropped.")
+                self._release()
+                if span:
+                    span.status = "error"
+                return None
+
+            frame = self._read_source() if self.spec.source else self._synthesize()
+            self.frame_index += 1
+            if frame is not None and self._random.random() < self.spec.corrupt_rate:
+                self._corrupt(frame)
+                if span:
+                    span.attributes["corrupt"] = True
+            if frame is None and span:
+                span.status = "error"
+        return frame
+
+    @performance_monitor
+    def disconnect(self):
+        """Closes the virtual stream."""
+        self._release()
+
+    def _synthesize(self) -> np.ndarray:
+        # Move a bright bar across a reused canvas and stamp the frame number, so
+        # consecutive frames differ without allocating a new full-size image.
+        canvas = self._canvas
+        width = self.spec.width
+        bar = max(1, width // 32)
+        x = (self.frame_index * bar) % width
+        canvas[:, :, :] = 32
+        canvas[:, x:x + bar, :] = 224
+        cv2.putText(canvas, f"{self.config.camera_id} #{self.frame_index}", (16, 48),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+        return canvas.copy()
+
+    def _corrupt(self, frame: np.ndarray):
+        """
+        Garbles `frame` in place like a truncated or lost packet: from a random
+        row down, the image is shifted sideways and smeared with the last good row.
+        """
+        height, width = frame.shape[:2]
+        start = self._random.randrange(height)
+        frame[start:] = np.roll(frame[start:], self._random.randrange(1, max(2, width)), axis=1)
+        if start > 0:
+            frame[start + (height - start) // 2:] = frame[start - 1]
+
+    def _read_source(self) -> np.ndarray | None:
+        ret, frame = self.cap.read()
+        if not ret:
+            # Loop the file.
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _release(self):
+        if self.cap is not None:
+            self.cap.release()
+        self.cap = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disconnect()
+
+
+def virtual_client_factory(spec: VirtualCameraSpec):
+    """
+    Returns a `client_factory` that builds VirtualCameraClients sharing `spec`.
+
+    Every client of a camera shares that camera's FrameClock, so the stream
+    stays paced at `fps` even though the capture engine connects anew for each
+    attempt.
+
+    With `spec.seed` set, the n-th client of a camera is seeded from
+    (spec.seed, camera_id, n). Reconnects therefore do not replay the previous
+    connect's faults, and each camera sees the same fault sequence on every run
+    regardless of how worker threads are scheduled.
+    """
+    connects = Counter()
+    frame_clocks = {}
+    lock = threading.Lock()
+
+    def factory(config: CameraConfig) -> VirtualCameraClient:
+        with lock:
+            connects[config.camera_id] += 1
+            connect_count = connects[config.camera_id]
+            frame_clock = frame_clocks.get(config.camera_id)
+            if frame_clock is None:
+                frame_clock = frame_clocks[config.camera_id] = FrameClock(spec.fps)
+        seed = _derive_seed(spec.seed, config.camera_id, connect_count) if spec.seed is not None else None
+        return VirtualCameraClient(config, spec, seed, frame_clock)
+
+    return factory
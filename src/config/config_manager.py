@@ -50,7 +50,7 @@ class ConfigManager:
         """Override configuration with environment variables."""
         # Example for camera IP
         camera_ip = os.environ.get('CAMERA_IP')
-        if camera_ip:
+        if camera_ip and 'camera' in config:
             config['camera']['ip'] = camera_ip
             logger.info(f"Overridden camera IP with environment variable: {camera_ip}")
 
@@ -61,12 +61,19 @@ class ConfigManager:
         Validates the configuration data.
         """
         try:
-            # Validate camera config
+            # Validate camera config: a single 'camera' and/or a 'cameras' list
             camera_conf = config_data.get('camera')
-            if not camera_conf:
+            cameras_conf = config_data.get('cameras')
+            if not camera_conf and not cameras_conf:
                 logger.error("'camera' section is missing in config")
                 return False
-            CameraConfig(**camera_conf) # Use dataclass for validation
+            camera_ids = set()
+            for conf in ([camera_conf] if camera_conf else []) + list(cameras_conf or []):
+                camera = CameraConfig(**conf) # Use dataclass for validation
+                if camera.camera_id in camera_ids:
+                    logger.error(f"Duplicate camera_id in config: {camera.camera_id}")
+                    return False
+                camera_ids.add(camera.camera_id)
 
             # Validate logging config
             log_conf = config_data.get('logging')
@@ -82,11 +89,35 @@ class ConfigManager:
 
     def get_camera_config(self) -> CameraConfig:
         """Returns the camera configuration as a CameraConfig object."""
+        if 'camera' not in self.config:
+            return self.get_camera_configs()[0]
         return CameraConfig(**self.config['camera'])
 
+    def get_camera_configs(self) -> list[CameraConfig]:
+        """Returns every configured camera: the 'camera' section followed by the 'cameras' list."""
+        configs = [self.config['camera']] if 'camera' in self.config else []
+        configs.extend(self.config.get('cameras', []))
+        return [CameraConfig(**conf) for conf in configs]
+
     def get_logging_config(self):
         """Returns the logging configuration."""
         return self.config['logging']
 
+    def get_tracing_config(self):
+        """Returns the optional tracing configuration (empty if tracing is not configured)."""
+        return self.config.get('tracing', {})
+
+    def get_health_config(self):
+        """Returns the optional health-probe configuration (empty if probing is disabled)."""
+        return self.config.get('health', {})
+
+    def get_server_config(self):
+        """Returns the optional snapshot-server configuration."""
+        return self.config.get('server', {})
+
+    def get_stats_config(self):
+        """Returns the optional run-statistics configuration."""
+        return self.config.get('stats', {})
+
 # Global config instance
 # config_manager = ConfigManager() 
\ No newline at end of file
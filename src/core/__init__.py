@@ -0,0 +1,5 @@
+"""
+This file initializes the 'core' module, making it a Python package.
+This module contains the core business logic: the capture state machine and
+the capture engine that drives a camera client through it.
+"""
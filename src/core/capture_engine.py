@@ -0,0 +1,171 @@
+"""
+This module implements the capture engine, which drives a camera client through
+the CaptureStateMachine to capture and save a single image.
+
+If a HealthCache is supplied, cameras that a recent probe found to be down are
+skipped without opening a stream. If a CaptureRunStats is supplied, every capture
+is recorded there as one columnar row, including its per-stage timings.
+
+Each call to `capture_image()` runs inside one trace. Every try of the retry
+loop is an `attempt` span carrying `attempt=N`, and that attempt's connect, read,
+convert, validate, encode and write spans are its children, so retries can be
+told apart while the whole capture shares one trace id.
+"""
+
+import os
+import time
+from datetime import datetime
+
+from src.camera.rtsp_client import RTSPClient
+from src.core.state_machine import CaptureEvent, CaptureStateMachine
+from src.models.camera_models import CameraConfig, CaptureResult, ImageInfo
+from src.utils.image_processor import ImageProcessor
+from src.utils.logger import logger
+from src.utils.run_stats import STAGES
+from src.utils.tracing import tracer
+
+
+class CaptureEngine:
+    """
+    Captures a single image from one camera, retrying on failure.
+    """
+    def __init__(
+        self,
+        config: CameraConfig,
+        output_dir: str = "output",
+        file_format: str = "jpg",
+        jpeg_quality: int = 95,
+        client_factory=RTSPClient,
+        health_cache=None,
+        run_stats=None,
+        node_id: str | None = None,
+    ):
+        self.config = config
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.jpeg_quality = jpeg_quality
+        self.client_factory = client_factory
+        self.health_cache = health_cache
+        self.run_stats = run_stats
+        self.node_id = node_id
+        self.state_machine = CaptureStateMachine(camera_id=config.camera_id)
+
+    def capture_image(self) -> CaptureResult:
+        """
+        Runs a full capture: connect, read, convert, validate, encode and write.
+
+        Returns:
+            A CaptureResult describing the outcome.
+        """
+        start_time = time.perf_counter()
+        error_message = None
+
+        if self.health_cache is not None and self.health_cache.is_known_down(self.config.camera_id):
+            probe = self.health_cache.get(self.config.camera_id)
+            reason = probe.error if probe and probe.error else "camera known to be down"
+            logger.warning(f"[{self.config.camera_id}] Skipping capture: {reason}")
+            if self.run_stats is not None:
+                self.run_stats.record(self.config.camera_id, False, 0.0)
+            return CaptureResult(success=False, error_message=f"Skipped: {reason}")
+
+        with tracer.trace("capture", camera_id=self.config.camera_id) as root:
+            for attempt in range(self.config.retry_count + 1):
+                if attempt > 0:
+                    self.state_machine.transition(CaptureEvent.RETRY)
+                    logger.info(f"[{self.config.camera_id}] Retrying capture (attempt {attempt + 1})")
+
+                with tracer.span("attempt", attempt=attempt + 1) as attempt_span:
+                    image_info, error_message = self._attempt()
+                    if attempt_span is not None and image_info is None:
+                        attempt_span.status = "error"
+                if image_info is not None:
+                    break
+            else:
+                image_info = None
+
+            self.state_machine.transition(CaptureEvent.RESET)
+            if root is not None:
+                root.attributes["attempts"] = attempt + 1
+                root.status = "ok" if image_info else "error"
+            stage_ms = self._stage_timings(attempt_span) if self.run_stats is not None else None
+
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
+        if self.run_stats is not None:
+            self.run_stats.record(
+                self.config.camera_id,
+                image_info is not None,
+                execution_time_ms,
+                stage_ms,
+                image_info.size if image_info else 0,
+            )
+
+        return CaptureResult(
+            success=image_info is not None,
+            image_info=image_info,
+            error_message=None if image_info else error_message,
+            execution_time_ms=execution_time_ms,
+        )
+
+    @staticmethod
+    def _stage_timings(attempt_span) -> dict:
+        """
+        Returns the durations of the stage spans (connect, read, ...) of the final
+        attempt; time spent in earlier, failed attempts only shows in the total.
+        """
+        if attempt_span is None:
+            return {}
+        return {
+            span.name: span.duration_ms
+            for span in tracer.current_spans()
+            if span.name in STAGES and span.parent_id == attempt_span.span_id
+        }
+
+    def _attempt(self):
+        """
+        Performs a single capture attempt.
+
+        Returns:
+            A tuple of (ImageInfo or None, error message or None).
+        """
+        sm = self.state_machine
+        sm.transition(CaptureEvent.START_CONNECT)
+        client = self.client_factory(self.config)
+        try:
+            if not client.connect():
+                sm.transition(CaptureEvent.CONNECT_FAILURE)
+                return None, "Failed to connect to camera"
+            sm.transition(CaptureEvent.CONNECT_SUCCESS)
+
+            # Credentials are carried in the stream URL, so a successful open
+            # implies successful authentication.
+            sm.transition(CaptureEvent.START_AUTH)
+            sm.transition(CaptureEvent.AUTH_SUCCESS)
+
+            sm.transition(CaptureEvent.START_CAPTURE)
+            frame = client.capture_frame()
+            if frame is None:
+                sm.transition(CaptureEvent.CAPTURE_FAILURE)
+                return None, "Failed to capture frame"
+
+            file_path = ImageProcessor.save_image(
+                frame=frame,
+                directory=self.output_dir,
+                camera_id=self.config.camera_id,
+                file_format=self.file_format,
+                jpeg_quality=self.jpeg_quality,
+                node_id=self.node_id,
+            )
+            if file_path is None:
+                sm.transition(CaptureEvent.CAPTURE_FAILURE)
+                return None, "Failed to save image"
+
+            sm.transition(CaptureEvent.CAPTURE_SUCCESS)
+            return ImageInfo(
+                timestamp=datetime.now(),
+                file_path=file_path,
+                size=os.path.getsize(file_path),
+                format=self.file_format.upper(),
+                metadata={"camera_id": self.config.camera_id, "trace_id": tracer.current_trace_id()},
+            ), None
+        finally:
+            client.disconnect()
@@ -0,0 +1,153 @@
+"""
+A load generator that drives the full capture, encode and save path against N
+virtual cameras on one machine, with no network involved.
+
+Each worker thread repeatedly picks the next camera in round-robin order and runs
+a complete `CaptureEngine.capture_image()` for it, so connects, fault-triggered
+retries, encodes and disk writes are all measured. The report gives throughput
+and latency percentiles, so runs with different camera and worker counts show
+how the pipeline scales.
+"""
+
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.camera.virtual_camera import virtual_client_factory
+from src.core.capture_engine import CaptureEngine
+from src.models.camera_models import CameraConfig, VirtualCameraSpec
+from src.utils.run_stats import CaptureRunStats
+
+
+@dataclass
+class LoadTestReport:
+    """
+    Summary of a load-test run.
+
+    Attributes:
+        cameras (int): Number of virtual cameras.
+        workers (int): Number of concurrent capture threads.
+        duration_s (float): Wall-clock duration of the run.
+        captures (int): Completed capture attempts.
+        successes (int): Captures that produced a saved image.
+        bytes_written (int): Total size of saved images.
+        latency (Dict): Latency percentiles of successful captures (p50_ms, p99_ms, max_ms).
+        errors (Dict[str, int]): Failure counts by error message.
+        run_stats (Optional[CaptureRunStats]): Columnar per-capture statistics of the run.
+    """
+    cameras: int
+    workers: int
+    duration_s: float
+    captures: int = 0
+    successes: int = 0
+    bytes_written: int = 0
+    latency: Dict = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    run_stats: Optional[CaptureRunStats] = None
+
+    @property
+    def throughput(self) -> float:
+        """Successful captures per second."""
+        return self.successes / self.duration_s if self.duration_s else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"Load test: {self.cameras} virtual cameras, {self.workers} workers, {self.duration_s:.1f} s",
+            f"  captures:   {self.captures} ({self.successes} ok, {self.captures - self.successes} failed)",
+            f"  throughput: {self.throughput:.1f} captures/s, {self.bytes_written / self.duration_s / 1e6:.1f} MB/s"
+            if self.duration_s else "  throughput: n/a",
+            f"  latency:    p50 {self.latency.get('p50_ms', 0):.0f} ms, p99 {self.latency.get('p99_ms', 0):.0f} ms, "
+            f"max {self.latency.get('max_ms', 0):.0f} ms",
+        ]
+        for message, count in sorted(self.errors.items(), key=lambda item: -item[1]):
+            lines.append(f"  error:      {count} x {message}")
+        return "\n".join(lines)
+
+
+def make_virtual_configs(count: int, retry_count: int = 1) -> list[CameraConfig]:
+    """Builds CameraConfigs for `count` virtual cameras."""
+    return [
+        CameraConfig(
+            ip="virtual",
+            username="virtual",
+            password="virtual",
+            camera_id=f"virtual_{index:04d}",
+            protocol="virtual",
+            retry_count=retry_count,
+        )
+        for index in range(count)
+    ]
+
+
+def run_load_test(
+    cameras: int,
+    spec: VirtualCameraSpec,
+    duration_s: float = 10.0,
+    workers: int = 8,
+    output_dir: str = "output/loadtest",
+    file_format: str = "jpg",
+    jpeg_quality: int = 95,
+    retry_count: int = 1,
+    run_stats: Optional[CaptureRunStats] = None,
+) -> LoadTestReport:
+    """
+    Runs captures against `cameras` virtual cameras for `duration_s` seconds.
+
+    Returns:
+        A LoadTestReport for the run.
+    """
+    factory = virtual_client_factory(spec)
+    run_stats = run_stats if run_stats is not None else CaptureRunStats()
+    engines = [
+        CaptureEngine(
+            config, os.path.join(output_dir, config.camera_id), file_format, jpeg_quality, factory,
+            run_stats=run_stats,
+        )
+        for config in make_virtual_configs(cameras, retry_count)
+    ]
+    # An engine (and its state machine) must not be used by two threads at once.
+    engine_locks = [threading.Lock() for _ in engines]
+    next_index = itertools.count()
+    errors: Dict[str, int] = {}
+    errors_lock = threading.Lock()
+
+    start = time.monotonic()
+    deadline = start + duration_s
+
+    def worker():
+        while time.monotonic() < deadline:
+            index = next(next_index) % len(engines)
+            with engine_locks[index]:
+                result = engines[index].capture_image()
+            if not result.success:
+                with errors_lock:
+                    errors[result.error_message] = errors.get(result.error_message, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loadgen") as pool:
+        for future in [pool.submit(worker) for _ in range(workers)]:
+            future.result()
+
+    columns = run_stats.columns()
+    latency = columns["total_ms"][columns["success"]]
+    return LoadTestReport(
+        cameras=cameras,
+        workers=workers,
+        duration_s=time.monotonic() - start,
+        captures=len(columns["success"]),
+        successes=int(columns["success"].sum()),
+        bytes_written=int(columns["bytes_written"].sum()),
+        latency={
+            "count": int(latency.size),
+            "p50_ms": float(np.percentile(latency, 50)) if latency.size else 0.0,
+            "p99_ms": float(np.percentile(latency, 99)) if latency.size else 0.0,
+            "max_ms": float(latency.max()) if latency.size else 0.0,
+        },
+        errors=errors,
+        run_stats=run_stats,
+    )
@@ -0,0 +1,140 @@
+"""
+Deterministic camera sharding across nodes, without a coordination service.
+
+Every node computes the same plan from the same camera list and node list, using
+rendezvous (highest-random-weight) hashing on `camera_id`: each camera ranks all
+nodes by a hash of (node, camera_id) and goes to the top-ranked node. Adding or
+removing one of N nodes therefore only moves the cameras whose top choice
+changed, about 1/N of them.
+
+Cameras differ in decode cost, so plain rendezvous hashing can leave one node with
+several expensive streams. With `load_factor` set, cameras are placed heaviest
+first, and a camera skips any node whose cost would exceed `load_factor` times the
+fair share; it goes to its next-ranked node instead (bounded-load rendezvous).
+That trades slightly more movement on membership changes for an even load.
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from src.models.camera_models import CameraConfig
+
+
+def node_names(node_count: int) -> List[str]:
+    """Returns the default names for `--node-count` nodes: node-0 ... node-(N-1)."""
+    return [f"node-{index}" for index in range(node_count)]
+
+
+def rendezvous_score(node: str, camera_id: str, weight: float = 1.0) -> float:
+    """
+    Returns the weighted rendezvous score of `camera_id` on `node`; higher wins.
+
+    Uses the logarithmic method, so a node's expected share is proportional to its weight.
+    """
+    digest = hashlib.blake2b(f"{node}\0{camera_id}".encode("utf-8"), digest_size=8).digest()
+    # Map the hash to a uniform value strictly inside (0, 1).
+    u = (int.from_bytes(digest, "big") + 0.5) / 2.0 ** 64
+    return -weight / math.log(u)
+
+
+def rank_nodes(camera_id: str, nodes: Iterable[str], weights: Optional[Dict[str, float]] = None) -> List[str]:
+    """Returns `nodes` ordered by preference for `camera_id`."""
+    weights = weights or {}
+    return sorted(nodes, key=lambda node: rendezvous_score(node, camera_id, weights.get(node, 1.0)), reverse=True)
+
+
+@dataclass
+class ShardPlan:
+    """
+    An assignment of cameras to nodes.
+
+    Attributes:
+        nodes (List[str]): The participating nodes.
+        assignment (Dict[str, str]): camera_id -> node.
+        costs (Dict[str, float]): camera_id -> decode cost.
+        weights (Dict[str, float]): Relative node capacities (default 1.0).
+    """
+    nodes: List[str]
+    assignment: Dict[str, str] = field(default_factory=dict)
+    costs: Dict[str, float] = field(default_factory=dict)
+    weights: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, configs: Iterable[CameraConfig], nodes: List[str], weights: Optional[Dict[str, float]] = None,
+              load_factor: Optional[float] = 1.25) -> "ShardPlan":
+        """
+        Computes the plan for `configs` over `nodes`.
+
+        Args:
+            configs: The cameras to place.
+            nodes: Node names; every node must use the same list.
+            weights: Optional relative capacity per node.
+            load_factor: Cap on each node's cost relative to its fair share, or
+                None for plain rendezvous hashing.
+
+        Raises:
+            ValueError: If `nodes` is empty, has duplicates, or `load_factor` < 1.
+        """
+        if not nodes:
+            raise ValueError("At least one node is required")
+        if len(set(nodes)) != len(nodes):
+            raise ValueError(f"Duplicate node names: {nodes}")
+        if load_factor is not None and load_factor < 1.0:
+            raise ValueError("load_factor must be at least 1.0")
+
+        weights = dict(weights or {})
+        plan = cls(nodes=list(nodes), weights=weights)
+        configs = list(configs)
+        plan.costs = {config.camera_id: float(config.decode_cost) for config in configs}
+
+        if load_factor is None:
+            for config in configs:
+                plan.assignment[config.camera_id] = rank_nodes(config.camera_id, nodes, weights)[0]
+            return plan
+
+        total_cost = sum(plan.costs.values())
+        total_weight = sum(weights.get(node, 1.0) for node in nodes)
+        max_cost = max(plan.costs.values(), default=0.0)
+        # A node may always take one camera, even if that camera alone exceeds its share.
+        capacity = {
+            node: max(load_factor * total_cost * weights.get(node, 1.0) / total_weight, max_cost)
+            for node in nodes
+        }
+        load = dict.fromkeys(nodes, 0.0)
+        # Heaviest first (ties by camera_id) so the order, and thus the plan, is deterministic.
+        for camera_id in sorted(plan.costs, key=lambda cid: (-plan.costs[cid], cid)):
+            cost = plan.costs[camera_id]
+            ranked = rank_nodes(camera_id, nodes, weights)
+            node = next((n for n in ranked if load[n] + cost <= capacity[n]), ranked[0])
+            plan.assignment[camera_id] = node
+            load[node] += cost
+        return plan
+
+    def cameras_for(self, node: str) -> List[str]:
+        """Returns the camera ids assigned to `node`, sorted."""
+        return sorted(camera_id for camera_id, owner in self.assignment.items() if owner == node)
+
+    def load(self) -> Dict[str, float]:
+        """Returns the total decode cost assigned to each node."""
+        load = dict.fromkeys(self.nodes, 0.0)
+        for camera_id, node in self.assignment.items():
+            load[node] += self.costs[camera_id]
+        return load
+
+    def format(self, show_cameras: bool = False) -> str:
+        """Renders the plan and the expected load per node as text."""
+        load = self.load()
+        total_cost = sum(load.values())
+        total_weight = sum(self.weights.get(node, 1.0) for node in self.nodes)
+        lines = [f"Shard plan: {len(self.assignment)} cameras over {len(self.nodes)} nodes, "
+                 f"total decode cost {total_cost:.1f}"]
+        for node in self.nodes:
+            cameras = self.cameras_for(node)
+            expected = total_cost * self.weights.get(node, 1.0) / total_weight if total_weight else 0.0
+            ratio = load[node] / expected if expected else 0.0
+            lines.append(f"  {node}: {len(cameras)} cameras, cost {load[node]:.1f} ({ratio:.2f}x fair share)")
+            if show_cameras:
+                lines.extend(f"    {camera_id} ({self.costs[camera_id]:g})" for camera_id in cameras)
+        return "\n".join(lines)
@@ -0,0 +1,350 @@
+"""
+A small built-in HTTP service that serves the current picture of a camera.
+
+    GET /cameras/{camera_id}/snapshot[?max_age_ms=N][&quality=Q][&width=W]
+    GET /stats
+
+Each camera keeps a warm `CameraSession` whose background reader keeps the stream
+drained, so a snapshot waits for the next live frame and an encode rather than a
+full connect. Concurrent requests for the same camera are coalesced by
+`SingleFlight`: one request waits for a frame, the others share it. Encodes go through the EncodedImageCache, which
+coalesces concurrent encodes of the same rendition. `max_age_ms` lets callers
+accept the last frame if it is recent enough.
+"""
+
+import itertools
+import json
+import numpy as np
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from src.camera.rtsp_client import RTSPClient
+from src.models.camera_models import CameraConfig
+from src.utils.encode_cache import EncodedImageCache, encoded_image_cache
+from src.utils.image_processor import ImageProcessor
+from src.utils.logger import logger
+from src.utils.single_flight import SingleFlight
+from src.utils.tracing import tracer
+
+# Process-wide session ids. Frame sequence numbers restart at 1 in every session,
+# so cache keys pair them with the session id to stay unique.
+_session_ids = itertools.count(1)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    An encoded picture of a camera.
+
+    Attributes:
+        camera_id (str): The camera the frame came from.
+        frame_seq (int): Per-session sequence number of the frame.
+        data (bytes): The encoded image.
+        content_type (str): MIME type of `data`.
+        captured_at (float): Monotonic clock reading when the frame was grabbed.
+    """
+    camera_id: str
+    frame_seq: int
+    data: bytes
+    content_type: str
+    captured_at: float
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot cannot be produced."""
+
+
+class SnapshotStats:
+    """Thread-safe counters for the snapshot service."""
+    FIELDS = ("requests", "served", "coalesced", "fresh_hits", "captures", "errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self._counts[name] += value
+
+    def add_waiting(self, delta: int):
+        with self._lock:
+            self.waiting += delta
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts, waiting=self.waiting)
+
+
+class CameraSession:
+    """
+    Keeps a client connected to one camera and remembers the latest decoded frame.
+
+    A stream that is only read when a request arrives keeps buffering in
+    between, so the next grab would return the oldest buffered frame rather
+    than the current picture. Once the first snapshot is requested, a
+    background reader therefore reads the stream continuously and publishes
+    each valid frame as `latest`; `capture()` waits for the first frame read
+    after it was called.
+    """
+    def __init__(self, config: CameraConfig, client_factory=RTSPClient, frame_timeout_s: float = 5.0,
+                 retry_interval_s: float = 1.0):
+        self.config = config
+        self.client_factory = client_factory
+        self.frame_timeout_s = frame_timeout_s
+        self.retry_interval_s = retry_interval_s
+        self.client = None
+        self.session_id = next(_session_ids)
+        self.frame_seq = 0
+        self.latest: Optional[CapturedFrame] = None
+        self._failed_at: Optional[float] = None
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._reader: Optional[threading.Thread] = None
+
+    def capture(self) -> "CapturedFrame":
+        """
+        Returns the first valid frame read after this call.
+
+        Raises:
+            SnapshotError: If the stream fails, or no frame arrives within `frame_timeout_s`.
+        """
+        requested_at = time.monotonic()
+        self._start_reader()
+        with tracer.span("wait_frame", camera_id=self.config.camera_id) as span:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stop.is_set()
+                    or (self.latest is not None and self.latest.captured_at >= requested_at)
+                    or (self._failed_at is not None and self._failed_at >= requested_at),
+                    timeout=self.frame_timeout_s,
+                )
+                latest = self.latest
+            if latest is None or latest.captured_at < requested_at:
+                if span:
+                    span.status = "error"
+                raise SnapshotError(f"Failed to capture frame from {self.config.camera_id}")
+            return latest
+
+    def _start_reader(self):
+        with self._condition:
+            if self._reader is None and not self._stop.is_set():
+                self._reader = threading.Thread(
+                    target=self._read_loop, name=f"snapshot-reader-{self.config.camera_id}", daemon=True
+                )
+                self._reader.start()
+
+    def _read_loop(self):
+        while not self._stop.is_set():
+            frame = self._read_frame()
+            if frame is None and not self._stop.is_set():
+                # The connection may have gone stale; reconnect and try once more.
+                self._close_client()
+                frame = self._read_frame()
+            captured_at = time.monotonic()
+
+            if frame is None or not ImageProcessor.validate_image(frame):
+                logger.warning(f"[{self.config.camera_id}] Snapshot reader failed to read a frame; retrying")
+                self._close_client()
+                with self._condition:
+                    self._failed_at = captured_at
+                    self._condition.notify_all()
+                self._stop.wait(self.retry_interval_s)
+                continue
+
+            with self._condition:
+                self.frame_seq += 1
+                self.latest = CapturedFrame(self.frame_seq, frame, captured_at, self.session_id)
+                self._condition.notify_all()
+        self._close_client()
+
+    def _read_frame(self):
+        if self.client is None:
+            client = self.client_factory(self.config)
+            if not client.connect():
+                return None
+            self.client = client
+        return self.client.capture_frame()
+
+    def _close_client(self):
+        if self.client is not None:
+            self.client.disconnect()
+            self.client = None
+
+    def close(self):
+        """Stops the background reader and disconnects."""
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+            reader = self._reader
+        if reader is not None:
+            reader.join(self.frame_timeout_s)
+        else:
+            self._close_client()
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    """A decoded frame held by a CameraSession."""
+    frame_seq: int
+    frame: np.ndarray
+    captured_at: float
+    session_id: int = 0
+
+    @property
+    def frame_id(self) -> tuple:
+        """Identifies the frame uniquely within the process, for encoded image cache keys."""
+        return self.session_id, self.frame_seq
+
+
+class SnapshotService:
+    """
+    Serves snapshots from warm camera sessions with single-flight coalescing.
+
+    Encoded renditions are looked up in an EncodedImageCache, so repeated requests
+    for the same frame, size and quality are encoded only once.
+    """
+    def __init__(self, configs: Iterable[CameraConfig], client_factory=RTSPClient, file_format: str = "jpg",
+                 jpeg_quality: int = 90, cache: Optional[EncodedImageCache] = None):
+        self.sessions = {config.camera_id: CameraSession(config, client_factory) for config in configs}
+        self.file_format = file_format
+        self.jpeg_quality = jpeg_quality
+        self.cache = cache if cache is not None else encoded_image_cache
+        self.single_flight = SingleFlight()
+        self.stats = SnapshotStats()
+
+    def get_snapshot(self, camera_id: str, max_age_ms: Optional[float] = None, quality: Optional[int] = None,
+                     width: Optional[int] = None) -> Snapshot:
+        """
+        Returns a snapshot of `camera_id` no older than `max_age_ms` (if given),
+        optionally resized to `width` pixels wide and encoded at `quality`.
+
+        Raises:
+            KeyError: If the camera is unknown.
+            SnapshotError: If a fresh snapshot could not be produced.
+        """
+        session = self.sessions[camera_id]
+        self.stats.incr("requests")
+
+        # One trace per request. A coalesced request's trace only shows the wait;
+        # the capture spans belong to the request that led the flight.
+        with tracer.trace("snapshot", camera_id=camera_id) as root:
+            latest = session.latest
+            if (max_age_ms is not None and latest is not None
+                    and (time.monotonic() - latest.captured_at) * 1000 <= max_age_ms):
+                self.stats.incr("fresh_hits")
+                captured, shared, fresh_hit = latest, False, True
+            else:
+                self.stats.add_waiting(1)
+                try:
+                    captured, shared = self.single_flight.do(camera_id, lambda: self._capture(session))
+                except SnapshotError:
+                    self.stats.incr("errors")
+                    raise
+                finally:
+                    self.stats.add_waiting(-1)
+                fresh_hit = False
+                if shared:
+                    self.stats.incr("coalesced")
+            if root is not None:
+                root.attributes.update(fresh_hit=fresh_hit, coalesced=shared)
+
+            snapshot = self._render(camera_id, captured, quality or self.jpeg_quality, width)
+        self.stats.incr("served")
+        return snapshot
+
+    def _capture(self, session: CameraSession) -> CapturedFrame:
+        self.stats.incr("captures")
+        return session.capture()
+
+    def _render(self, camera_id: str, captured: CapturedFrame, quality: int, width: Optional[int]) -> Snapshot:
+        size = None
+        if width:
+            height, frame_width = captured.frame.shape[:2]
+            size = (width, max(1, round(height * width / frame_width)))
+        data = ImageProcessor.encode_image_cached(
+            captured.frame, camera_id, captured.frame_id, self.file_format, quality, size, self.cache
+        )
+        if data is None:
+            self.stats.incr("errors")
+            raise SnapshotError(f"Failed to encode frame from {camera_id}")
+        content_type = "image/png" if self.file_format.lower() == "png" else "image/jpeg"
+        return Snapshot(camera_id, captured.frame_seq, data, content_type, captured.captured_at)
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for a SnapshotService (set as `server.service`)."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        service = self.server.service
+
+        if parts == ["stats"]:
+            stats = dict(service.stats.snapshot(), encode_cache=service.cache.stats())
+            self._send(200, "application/json", json.dumps(stats).encode("utf-8"))
+            return
+
+        if len(parts) != 3 or parts[0] != "cameras" or parts[2] != "snapshot":
+            self._send_error(404, "Not found")
+            return
+
+        query = parse_qs(url.query)
+        try:
+            max_age_ms = float(query["max_age_ms"][0]) if "max_age_ms" in query else None
+            quality = int(query["quality"][0]) if "quality" in query else None
+            width = int(query["width"][0]) if "width" in query else None
+        except ValueError:
+            self._send_error(400, "max_age_ms, quality and width must be numbers")
+            return
+        if (quality is not None and not 1 <= quality <= 100) or (width is not None and width <= 0):
+            self._send_error(400, "quality must be 1-100 and width must be positive")
+            return
+
+        try:
+            snapshot = service.get_snapshot(parts[1], max_age_ms, quality, width)
+        except KeyError:
+            self._send_error(404, f"Unknown camera: {parts[1]}")
+            return
+        except SnapshotError as e:
+            self._send_error(503, str(e))
+            return
+
+        age_ms = (time.monotonic() - snapshot.captured_at) * 1000
+        self._send(200, snapshot.content_type, snapshot.data, {
+            "X-Frame-Seq": str(snapshot.frame_seq),
+            "X-Frame-Age-Ms": f"{age_ms:.0f}",
+            "Cache-Control": "no-store",
+        })
+
+    def _send(self, status: int, content_type: str, body: bytes, headers: Optional[dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str):
+        self._send(status, "application/json", json.dumps({"error": message}).encode("utf-8"))
+
+    def log_message(self, format, *args):
+        logger.info(f"Snapshot server: {self.address_string()} {format % args}")
+
+
+def create_snapshot_server(service: SnapshotService, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    """Creates (but does not start) a threaded HTTP server for `service`."""
+    server = ThreadingHTTPServer((host, port), SnapshotRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
@@ -4,7 +4,14 @@ It defines the possible states, events, and transitions to manage the lifecycle
 of connecting to a camera and capturing an image in a robust and predictable way.
 """
 
+import time
+from collections import deque
+from dataclasses import dataclass
 from enum import Enum, auto
+from typing import Optional
+
+from src.utils.logger import logger
+from src.utils.monitor import HistogramRegistry, dwell_time_histograms
 
 class CaptureState(Enum):
     """Enumeration of possible states in the capture process."""
@@ -32,6 +39,24 @@ class CaptureEvent(Enum):
     RETRY = auto()
     RESET = auto()
 
+@dataclass(frozen=True)
+class StateTransition:
+    """
+    A record of a single state transition.
+
+    Attributes:
+        from_state (CaptureState): The state that was left.
+        to_state (CaptureState): The state that was entered.
+        event (CaptureEvent): The event that triggered the transition.
+        timestamp (float): Monotonic clock reading at the moment of the transition.
+        dwell_ms (float): Time spent in `from_state` before leaving it.
+    """
+    from_state: CaptureState
+    to_state: CaptureState
+    event: CaptureEvent
+    timestamp: float
+    dwell_ms: float
+
 class CaptureStateMachine:
     """
     Manages the state of the camera capture lifecycle.
@@ -39,10 +64,27 @@ class CaptureStateMachine:
     This class holds the current state and defines the valid transitions
     between states based on events. It ensures that the capture process
     follows a logical and controlled flow.
+
+    Every transition is timestamped with a monotonic clock, kept in a bounded
+    `history`, and the dwell time of the state being left is recorded in a
+    per-camera, per-state histogram.
     """
 
-    def __init__(self, initial_state: CaptureState = CaptureState.DISCONNECTED):
+    HISTORY_SIZE = 64
+
+    def __init__(
+        self,
+        initial_state: CaptureState = CaptureState.DISCONNECTED,
+        camera_id: str = "default",
+        histograms: Optional[HistogramRegistry] = None,
+        clock=time.monotonic,
+    ):
         self.current_state = initial_state
+        self.camera_id = camera_id
+        self.histograms = histograms if histograms is not None else dwell_time_histograms
+        self._clock = clock
+        self.state_entered_at = clock()
+        self.history = deque(maxlen=self.HISTORY_SIZE)
         
         # Define the valid transitions in a dictionary for clarity and ease of management.
         # Format: {current_state: {event: next_state}}
@@ -99,14 +141,26 @@ class CaptureStateMachine:
         """
         if self.current_state in self.transitions and event in self.transitions[self.current_state]:
             next_state = self.transitions[self.current_state][event]
-            # print(f"State transition: {self.current_state.name} -> {next_state.name} on event {event.name}")
+            now = self._clock()
+            dwell_ms = (now - self.state_entered_at) * 1000
+            self.histograms.observe((self.camera_id, self.current_state.name), dwell_ms)
+            self.history.append(StateTransition(self.current_state, next_state, event, now, dwell_ms))
+            logger.debug(
+                f"[{self.camera_id}] State transition: {self.current_state.name} -> {next_state.name} "
+                f"on event {event.name} after {dwell_ms:.2f} ms"
+            )
             self.current_state = next_state
+            self.state_entered_at = now
             return self.current_state
         
         raise ValueError(
             f"Invalid transition: Cannot handle event '{event.name}' in state '{self.current_state.name}'"
         )
 
+    def time_in_state_ms(self) -> float:
+        """Returns how long the machine has been in its current state."""
+        return (self._clock() - self.state_entered_at) * 1000
+
     def is_terminal(self) -> bool:
         """Checks if the state machine is in a terminal state (COMPLETED or ERROR without retry)."""
         return self.current_state in [CaptureState.COMPLETED, CaptureState.ERROR] 
\ No newline at end of file
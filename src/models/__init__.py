@@ -5,14 +5,18 @@ This allows other parts of the application to import them directly from the `mod
 
 from .camera_models import (
     CameraConfig,
+    VirtualCameraSpec,
     ConnectionStatus,
     ImageInfo,
     CaptureResult,
+    ProbeResult,
 )
 
 __all__ = [
     "CameraConfig",
+    "VirtualCameraSpec",
     "ConnectionStatus",
     "ImageInfo",
     "CaptureResult",
+    "ProbeResult",
 ] 
\ No newline at end of file
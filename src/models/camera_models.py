@@ -2,6 +2,9 @@
 This module defines the core data structures (data classes) used throughout the application.
 These structures ensure data consistency and provide clear definitions for a-ntities 
 like Camera Configuration, Connection Status, and Capture Results.
+
+All models use `__slots__` (via `slots=True`): fleet runs create one CaptureResult
+and ImageInfo per capture, and dropping the per-instance `__dict__` keeps them small.
 """
 
 from dataclasses import dataclass, field
@@ -9,7 +12,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from enum import Enum, auto
 
-@dataclass
+@dataclass(slots=True)
 class CameraConfig:
     """
     Represents the configuration for a single camera.
@@ -24,6 +27,8 @@ class CameraConfig:
         retry_count (int): Number of retries on connection failure. Defaults to 3.
         camera_id (str): A unique identifier for the camera.
         rtsp_path (str): The RTSP path for the camera. Defaults to an empty string.
+        decode_cost (float): Relative cost of keeping this stream decoded (e.g. scaled by
+            resolution and fps), used to balance cameras across nodes. Defaults to 1.0.
     """
     ip: str
     username: str
@@ -34,8 +39,37 @@ class CameraConfig:
     protocol: str = "rtsp"
     timeout: int = 10
     retry_count: int = 3
+    decode_cost: float = 1.0
     
-@dataclass
+@dataclass(slots=True)
+class VirtualCameraSpec:
+    """
+    Describes a virtual camera used for load testing without real hardware.
+
+    Attributes:
+        width (int): Width of synthetic frames in pixels. Defaults to 1920.
+        height (int): Height of synthetic frames in pixels. Defaults to 1080.
+        fps (float): Frame rate the stream is paced at. Defaults to 25.
+        source (Optional[str]): A local video file to play (looped) instead of synthetic frames.
+        realtime (bool): If True, frames are delivered no faster than `fps`.
+        connect_delay_ms (float): Simulated connect latency in milliseconds.
+        auth_failure_rate (float): Probability that a connect fails authentication.
+        drop_rate (float): Probability, per frame, that the stream drops.
+        corrupt_rate (float): Probability, per frame, that a garbled full-size frame is returned.
+        seed (Optional[int]): Seed for fault injection, for reproducible runs.
+    """
+    width: int = 1920
+    height: int = 1080
+    fps: float = 25.0
+    source: Optional[str] = None
+    realtime: bool = True
+    connect_delay_ms: float = 0.0
+    auth_failure_rate: float = 0.0
+    drop_rate: float = 0.0
+    corrupt_rate: float = 0.0
+    seed: Optional[int] = None
+
+@dataclass(slots=True)
 class ConnectionStatus:
     """
     Holds the current connection status of a camera client.
@@ -51,7 +85,7 @@ class ConnectionStatus:
     retry_count: int = 0
     last_attempt_time: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
 class ImageInfo:
     """
     Contains metadata about a captured image.
@@ -69,7 +103,7 @@ class ImageInfo:
     format: str
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class CaptureResult:
     """
     Represents the result of a capture operation.
@@ -86,4 +120,40 @@ class CaptureResult:
     success: bool
     image_info: Optional[ImageInfo] = None
     error_message: Optional[str] = None
-    execution_time_ms: float = 0.0 
\ No newline at end of file
+    execution_time_ms: float = 0.0 
+
+@dataclass(slots=True)
+class ProbeResult:
+    """
+    The outcome of a lightweight protocol-level health probe of a camera.
+
+    Attributes:
+        camera_id (str): The camera that was probed.
+        reachable (bool): True if the camera answered with a parseable response.
+        status_code (Optional[int]): The status code of the final response received.
+        auth_ok (Optional[bool]): True/False if credentials were accepted/rejected,
+            None if the probe could not tell.
+        rtt_ms (Optional[float]): Round-trip time of the first request, in milliseconds.
+        error (Optional[str]): Error description if the probe failed.
+        checked_at (float): Monotonic clock reading when the probe finished.
+    """
+    camera_id: str
+    reachable: bool
+    status_code: Optional[int] = None
+    auth_ok: Optional[bool] = None
+    rtt_ms: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: float = 0.0
+
+    @property
+    def is_healthy(self) -> bool:
+        """
+        A camera is healthy if it is reachable, did not reject our credentials and
+        its final response was a success (not e.g. 404 or 503).
+        """
+        return (
+            self.reachable
+            and self.auth_ok is not False
+            and self.status_code is not None
+            and 200 <= self.status_code < 300
+        )
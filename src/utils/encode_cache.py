@@ -0,0 +1,145 @@
+"""
+A memory-bounded LRU cache of encoded images.
+
+Entries are keyed by (camera_id, frame_id, rendition, quality), so a given frame
+is encoded at most once per rendition and quality. The cache is bounded by total
+bytes (least recently used entries are evicted first) and by age (entries older
+than `max_age_seconds` are dropped).
+
+The cache lock only guards dictionary bookkeeping. Encoding happens outside it,
+and concurrent misses for the same key are coalesced with SingleFlight so the
+frame is still encoded only once.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from src.utils.single_flight import SingleFlight
+
+
+class EncodedImageCache:
+    """
+    A thread-safe, byte-budgeted LRU cache of encoded image bytes.
+
+    Attributes:
+        max_bytes (int): Upper bound on the total size of cached entries.
+        max_age_seconds (float): Entries older than this are treated as missing.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_age_seconds: float = 60.0, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (data, inserted_at)
+        self._lock = threading.Lock()
+        self._single_flight = SingleFlight()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Returns the cached bytes for `key` (marking them recently used), or None."""
+        data = self._lookup(key)
+        self._count("hits" if data is not None else "misses")
+        return data
+
+    def _lookup(self, key: Hashable) -> Optional[bytes]:
+        """Like `get`, but without counting a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[1] > self.max_age_seconds:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def put(self, key: Hashable, data: bytes):
+        """Stores `data`, evicting expired and then least recently used entries as needed."""
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            now = self._clock()
+            self._entries[key] = (data, now)
+            self.total_bytes += size
+            self._expire(now)
+            while self.total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_encode(self, key: Hashable, encode: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """
+        Returns the cached bytes for `key`, calling `encode()` on a miss.
+        Failed encodes (None) are not cached.
+
+        Each call counts once: as a hit if the bytes were cached, as coalesced if
+        it shared another caller's in-flight encode, and as a miss if it encoded.
+        """
+        data = self._lookup(key)
+        if data is not None:
+            self._count("hits")
+            return data
+
+        def encode_and_store():
+            # A flight for this key may have finished since the lookup above.
+            data = self._lookup(key)
+            if data is not None:
+                return data, True
+            data = encode()
+            if data is not None:
+                self.put(key, data)
+            return data, False
+
+        (data, cached), shared = self._single_flight.do(key, encode_and_store)
+        self._count("coalesced" if shared else "hits" if cached else "misses")
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key: Hashable):
+        data, _ = self._entries.pop(key)
+        self.total_bytes -= len(data)
+
+    def _expire(self, now: float):
+        # Entries are stored in insertion/use order, so expired entries cluster at
+        # the front; stop at the first fresh one. Stragglers expire on get().
+        while self._entries:
+            key, (_, inserted_at) = next(iter(self._entries.items()))
+            if now - inserted_at <= self.max_age_seconds:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+
+# Global cache shared by ImageProcessor and the snapshot service.
+encoded_image_cache = EncodedImageCache()
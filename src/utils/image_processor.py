@@ -2,7 +2,10 @@ import os
 import cv2
 import numpy as np
 from datetime import datetime
+from typing import Hashable
+from src.utils.encode_cache import encoded_image_cache
 from src.utils.logger import logger
+from src.utils.tracing import tracer
 
 class ImageProcessor:
     """
@@ -14,53 +17,149 @@ class ImageProcessor:
         directory: str = "output",
         camera_id: str = "cam1",
         file_format: str = "jpg",
-        jpeg_quality: int = 95
+        jpeg_quality: int = 95,
+        node_id: str | None = None
     ) -> str | None:
         """
         Saves a single frame to a file with a timestamp-based name.
 
+        The name is '<timestamp>_<camera_id>[_<node_id>].<ext>'. Including the node
+        keeps names unique when several nodes write to shared storage, and files
+        are created exclusively, so a clash gets a numeric suffix instead of
+        overwriting another image.
+
         Args:
             frame: The image frame (numpy array).
             directory: The directory to save the image in.
             camera_id: An identifier for the camera.
             file_format: The desired file format ('jpg' or 'png').
             jpeg_quality: The quality for JPEG saving (0-100).
+            node_id: The name of the node writing the image, when sharded.
 
         Returns:
             The path to the saved image, or None on failure.
         """
-        if not ImageProcessor.validate_image(frame):
+        with tracer.span("validate", camera_id=camera_id):
+            is_valid = ImageProcessor.validate_image(frame)
+        if not is_valid:
             return None
 
         try:
             if not os.path.exists(directory):
-                os.makedirs(directory)
+                # Another node may create the same directory on shared storage first.
+                os.makedirs(directory, exist_ok=True)
                 logger.info(f"Created output directory: {directory}")
 
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-            filename = f"{timestamp}_{camera_id}.{file_format}"
-            filepath = os.path.join(directory, filename)
-
-            if file_format.lower() == 'jpg':
-                params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
-                success = cv2.imwrite(filepath, frame, params)
-            elif file_format.lower() == 'png':
-                success = cv2.imwrite(filepath, frame)
-            else:
-                logger.error(f"Unsupported image format: {file_format}")
-                return None
+            stem = f"{timestamp}_{camera_id}_{node_id}" if node_id else f"{timestamp}_{camera_id}"
+            filepath = os.path.join(directory, f"{stem}.{file_format}")
 
-            if success:
-                logger.info(f"Successfully saved image to {filepath}")
-                return filepath
-            else:
+            with tracer.span("encode", camera_id=camera_id, format=file_format):
+                data = ImageProcessor.encode_image(frame, file_format, jpeg_quality)
+            if data is None:
                 logger.error(f"Failed to save image to {filepath}")
                 return None
 
+            with tracer.span("write", camera_id=camera_id, bytes=len(data)):
+                for attempt in range(1, 100):
+                    try:
+                        with open(filepath, "xb") as f:
+                            f.write(data)
+                        break
+                    except FileExistsError:
+                        filepath = os.path.join(directory, f"{stem}_{attempt}.{file_format}")
+                else:
+                    logger.error(f"Failed to find a free file name for {stem}")
+                    return None
+
+            logger.info(f"Successfully saved image to {filepath}")
+            return filepath
+
         except Exception as e:
             logger.error(f"An error occurred while saving the image: {e}")
             return None
 
+    @staticmethod
+    def encode_image(
+        frame: np.ndarray,
+        file_format: str = "jpg",
+        jpeg_quality: int = 95,
+        size: tuple[int, int] | None = None
+    ) -> bytes | None:
+        """
+        Encodes a frame into an in-memory image file.
+
+        Args:
+            frame: The image frame (numpy array).
+            file_format: The desired file format ('jpg' or 'png').
+            jpeg_quality: The quality for JPEG encoding (0-100).
+            size: Optional (width, height) to resize the frame to before encoding.
+
+        Returns:
+            The encoded bytes, or None on failure.
+        """
+        file_format = file_format.lower()
+        if size is not None and (frame.shape[1], frame.shape[0]) != tuple(size):
+            frame = cv2.resize(frame, tuple(size), interpolation=cv2.INTER_AREA)
+        if file_format == 'jpg':
+            params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        elif file_format == 'png':
+            params = []
+        else:
+            logger.error(f"Unsupported image format: {file_format}")
+            return None
+
+        success, buffer = cv2.imencode(f".{file_format}", frame, params)
+        if not success:
+            logger.error(f"Failed to encode image as {file_format}")
+            return None
+        return buffer.tobytes()
+
+    @staticmethod
+    def rendition_name(file_format: str = "jpg", size: tuple[int, int] | None = None) -> str:
+        """Returns the cache rendition label for a format and output size, e.g. 'jpg@640x360'."""
+        suffix = f"{size[0]}x{size[1]}" if size else "full"
+        return f"{file_format.lower()}@{suffix}"
+
+    @staticmethod
+    def encode_image_cached(
+        frame: np.ndarray,
+        camera_id: str,
+        frame_id: Hashable,
+        file_format: str = "jpg",
+        jpeg_quality: int = 95,
+        size: tuple[int, int] | None = None,
+        cache=None
+    ) -> bytes | None:
+        """
+        Like `encode_image`, but consults the encoded image cache first.
+
+        The cache key is (camera_id, frame_id, rendition, quality). The cache may
+        be shared process-wide, so `frame_id` must identify the frame uniquely
+        across every producer of frames for the camera, not just within one
+        session (see `CapturedFrame.frame_id`).
+
+        An `encode` span is only emitted when this call actually encodes; the
+        enclosing span is tagged with `encode_cache_hit`.
+        """
+        cache = cache if cache is not None else encoded_image_cache
+        quality = jpeg_quality if file_format.lower() == 'jpg' else None
+        rendition = ImageProcessor.rendition_name(file_format, size)
+        key = (camera_id, frame_id, rendition, quality)
+        encoded = False
+
+        def encode():
+            nonlocal encoded
+            encoded = True
+            with tracer.span("encode", camera_id=camera_id, rendition=rendition, quality=quality):
+                return ImageProcessor.encode_image(frame, file_format, jpeg_quality, size)
+
+        data = cache.get_or_encode(key, encode)
+        span = tracer.current_span()
+        if span is not None:
+            span.attributes["encode_cache_hit"] = not encoded
+        return data
+
     @staticmethod
     def validate_image(frame: np.ndarray) -> bool:
         """
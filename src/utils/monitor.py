@@ -1,3 +1,8 @@
+import bisect
+import json
+import math
+import os
+import threading
 import time
 from functools import wraps
 from src.utils.logger import logger
@@ -35,4 +40,126 @@ class HealthCheck:
             logger.info("Health check PASSED: Camera is connected.")
         else:
             logger.warning("Health check FAILED: Camera is not connected.")
-        return is_connected 
\ No newline at end of file
+        return is_connected 
+
+class DurationHistogram:
+    """
+    A fixed-bucket histogram of durations in milliseconds.
+
+    Buckets are cumulative-free upper bounds; observations above the last bound
+    fall into an overflow bucket. Percentiles are estimated from bucket bounds,
+    which is precise enough to tell a 5 ms dwell from a 5 s one.
+    """
+    DEFAULT_BOUNDS_MS = (
+        1, 2, 5, 10, 25, 50, 100, 250, 500,
+        1000, 2500, 5000, 10000, 30000, 60000,
+    )
+
+    def __init__(self, bounds_ms=DEFAULT_BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, duration_ms: float):
+        """Records a single duration."""
+        index = bisect.bisect_left(self.bounds_ms, duration_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += duration_ms
+            if duration_ms > self.max_ms:
+                self.max_ms = duration_ms
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns the upper bucket bound below which `q` percent of observations fall.
+        The overflow bucket reports the largest observed value.
+        """
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = max(1, math.ceil(self.count * q / 100.0))
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= rank:
+                    if index < len(self.bounds_ms):
+                        return float(min(self.bounds_ms[index], self.max_ms))
+                    return self.max_ms
+            return self.max_ms
+
+    def snapshot(self) -> dict:
+        """Returns a JSON-serialisable summary of the histogram."""
+        with self._lock:
+            count = self.count
+            mean = self.total_ms / count if count else 0.0
+            buckets = dict(zip([str(b) for b in self.bounds_ms] + ["+Inf"], self.counts))
+            max_ms = self.max_ms
+        return {
+            "count": count,
+            "mean_ms": mean,
+            "max_ms": max_ms,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class HistogramRegistry:
+    """
+    A thread-safe collection of DurationHistograms keyed by arbitrary hashable keys,
+    e.g. (camera_id, state_name).
+    """
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) -> DurationHistogram:
+        """Returns the histogram for `key`, creating it on first use."""
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, DurationHistogram())
+        return histogram
+
+    def observe(self, key, duration_ms: float):
+        self.get(key).observe(duration_ms)
+
+    @staticmethod
+    def key_name(key) -> str:
+        """Renders a key as a string; tuple keys are joined with '/', e.g. 'cam1/CONNECTING'."""
+        return "/".join(str(part) for part in key) if isinstance(key, tuple) else str(key)
+
+    def snapshot(self) -> dict:
+        """Returns {key name: histogram summary} for every registered key, sorted by name."""
+        with self._lock:
+            items = list(self._histograms.items())
+        summaries = {self.key_name(key): histogram.snapshot() for key, histogram in items}
+        return dict(sorted(summaries.items()))
+
+    def format(self) -> str:
+        """Renders one line per key with its count, mean, p50, p99 and max."""
+        return "\n".join(
+            f"  {name}: n={s['count']} mean {s['mean_ms']:.1f} ms, p50 {s['p50_ms']:.0f} ms, "
+            f"p99 {s['p99_ms']:.0f} ms, max {s['max_ms']:.1f} ms"
+            for name, s in self.snapshot().items()
+        )
+
+    def save_json(self, path: str):
+        """Writes the snapshot to `path` as JSON."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+# Global registry of per-camera, per-state dwell times fed by CaptureStateMachine.
+dwell_time_histograms = HistogramRegistry()
@@ -0,0 +1,265 @@
+"""
+Columnar capture-run statistics.
+
+Instead of keeping a CaptureResult object per capture, `CaptureRunStats` appends
+one row per capture into growable NumPy arrays: camera index, timestamp, success
+flag, total latency, per-stage timings and bytes written. Appending costs a few
+array stores, and per-camera aggregates (success rate, latency percentiles,
+stage means) are computed with vectorized NumPy operations over the columns.
+
+The accumulator can dump itself periodically to `.npz` (raw columns) and CSV
+(per-camera summary), so fleet statistics no longer have to be rebuilt from logs.
+Periodic dumps run on a background thread, so the capture that makes one due
+still only pays for its own row.
+"""
+
+import csv
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.utils.logger import logger
+
+# Stages recorded by the capture engine's trace spans. "read" is waiting for,
+# demuxing and decoding a frame (VideoCapture.grab()); "convert" is the colour
+# conversion done by VideoCapture.retrieve().
+STAGES = ("connect", "read", "convert", "validate", "encode", "write")
+
+
+class CaptureRunStats:
+    """
+    A thread-safe, columnar accumulator of per-capture statistics.
+
+    Attributes:
+        stages (tuple): Names of the stage-timing columns.
+        dump_path (Optional[str]): Base path for periodic dumps; '<base>.npz' and
+            '<base>_summary.csv' are written.
+        dump_interval_s (float): Minimum time between periodic dumps.
+    """
+    def __init__(self, stages=STAGES, initial_capacity: int = 1024, dump_path: Optional[str] = None,
+                 dump_interval_s: float = 60.0, clock=time.time):
+        self.stages = tuple(stages)
+        self.dump_path = dump_path
+        self.dump_interval_s = dump_interval_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._camera_ids: list[str] = []
+        self._camera_index: Dict[str, int] = {}
+        self._size = 0
+        self._capacity = max(1, initial_capacity)
+        self._columns = self._allocate(self._capacity)
+        self._last_dump = clock()
+        # Held for the whole of a dump, so dumps never overlap.
+        self._dump_lock = threading.Lock()
+        self._dump_thread: Optional[threading.Thread] = None
+
+    def _allocate(self, capacity: int) -> Dict[str, np.ndarray]:
+        columns = {
+            "camera_index": np.empty(capacity, dtype=np.int32),
+            "timestamp": np.empty(capacity, dtype=np.float64),
+            "success": np.empty(capacity, dtype=np.bool_),
+            "total_ms": np.empty(capacity, dtype=np.float32),
+            "bytes_written": np.empty(capacity, dtype=np.int64),
+        }
+        for stage in self.stages:
+            columns[f"{stage}_ms"] = np.empty(capacity, dtype=np.float32)
+        return columns
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def camera_ids(self) -> list[str]:
+        return list(self._camera_ids)
+
+    def record(self, camera_id: str, success: bool, total_ms: float, stage_ms: Optional[Dict[str, float]] = None,
+               bytes_written: int = 0, timestamp: Optional[float] = None):
+        """
+        Appends one capture. Stages missing from `stage_ms` are stored as NaN.
+        """
+        with self._lock:
+            index = self._camera_index.get(camera_id)
+            if index is None:
+                index = self._camera_index[camera_id] = len(self._camera_ids)
+                self._camera_ids.append(camera_id)
+            if self._size == self._capacity:
+                self._grow()
+
+            row = self._size
+            columns = self._columns
+            columns["camera_index"][row] = index
+            columns["timestamp"][row] = self._clock() if timestamp is None else timestamp
+            columns["success"][row] = success
+            columns["total_ms"][row] = total_ms
+            columns["bytes_written"][row] = bytes_written
+            for stage in self.stages:
+                columns[f"{stage}_ms"][row] = stage_ms.get(stage, np.nan) if stage_ms else np.nan
+            self._size += 1
+
+            dump_due = bool(self.dump_path) and self._clock() - self._last_dump >= self.dump_interval_s
+            if dump_due:
+                self._last_dump = self._clock()
+
+        if dump_due:
+            self._start_background_dump()
+
+    def _start_background_dump(self):
+        # Compressing and sorting every row is too slow for a capture thread. A
+        # periodic dump that falls due while another dump is running is skipped.
+        if not self._dump_lock.acquire(blocking=False):
+            return
+        thread = threading.Thread(target=self._background_dump, name="run-stats-dump", daemon=True)
+        self._dump_thread = thread
+        thread.start()
+
+    def _background_dump(self):
+        try:
+            self._write_dump()
+        finally:
+            self._dump_lock.release()
+
+    def wait_for_dump(self, timeout: Optional[float] = None):
+        """Waits for a running periodic dump, if any, to finish."""
+        thread = self._dump_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _grow(self):
+        self._capacity *= 2
+        grown = self._allocate(self._capacity)
+        for name, column in self._columns.items():
+            grown[name][:self._size] = column[:self._size]
+        self._columns = grown
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Returns a copy of the filled part of every column."""
+        return self._snapshot()[1]
+
+    def _snapshot(self):
+        with self._lock:
+            camera_ids = list(self._camera_ids)
+            columns = {name: column[:self._size].copy() for name, column in self._columns.items()}
+        return camera_ids, columns
+
+    def per_camera(self, percentiles=(50, 95, 99)) -> Dict[str, np.ndarray]:
+        """
+        Computes per-camera aggregates in one vectorized pass.
+
+        Latency percentiles (linear interpolation) and stage means only consider
+        successful captures; cameras without any are reported as NaN.
+
+        Returns:
+            A dict of equally long columns, indexed like `camera_ids`.
+        """
+        camera_ids, columns = self._snapshot()
+        n_cameras = len(camera_ids)
+        cams = columns["camera_index"]
+        ok = columns["success"]
+
+        captures = np.bincount(cams, minlength=n_cameras)
+        successes = np.bincount(cams[ok], minlength=n_cameras)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            summary = {
+                "camera_id": np.array(camera_ids, dtype=object),
+                "captures": captures,
+                "successes": successes,
+                "success_rate": successes / captures,
+                "bytes_written": np.bincount(cams, weights=columns["bytes_written"], minlength=n_cameras)
+                .astype(np.int64),
+            }
+            ok_cams = cams[ok]
+            latency = columns["total_ms"][ok].astype(np.float64)
+            summary.update(self._grouped_percentiles(ok_cams, latency, successes, percentiles))
+
+            for stage in self.stages:
+                values = columns[f"{stage}_ms"][ok].astype(np.float64)
+                present = ~np.isnan(values)
+                totals = np.bincount(ok_cams[present], weights=values[present], minlength=n_cameras)
+                counts = np.bincount(ok_cams[present], minlength=n_cameras)
+                summary[f"mean_{stage}_ms"] = totals / counts
+        return summary
+
+    @staticmethod
+    def _grouped_percentiles(groups: np.ndarray, values: np.ndarray, counts: np.ndarray,
+                             percentiles) -> Dict[str, np.ndarray]:
+        # Sort by (group, value); each group is then a contiguous, sorted run
+        # starting at `starts`, and every percentile is an index into that run.
+        order = np.lexsort((values, groups))
+        sorted_values = values[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        has_values = counts > 0
+        result = {}
+        for q in percentiles:
+            position = (counts - 1).clip(min=0) * (q / 100.0)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            fraction = position - lower
+            column = np.full(len(counts), np.nan)
+            if has_values.any():
+                lo = sorted_values[(starts + lower)[has_values]]
+                hi = sorted_values[(starts + upper)[has_values]]
+                column[has_values] = lo + (hi - lo) * fraction[has_values]
+            result[f"p{q}_ms"] = column
+        return result
+
+    def save_npz(self, path: str):
+        """Writes every column plus the camera id table to a compressed .npz file."""
+        camera_ids, columns = self._snapshot()
+        self._atomic_write(path, lambda f: np.savez_compressed(
+            f, camera_ids=np.array(camera_ids, dtype=str), **columns
+        ))
+
+    def save_summary_csv(self, path: str):
+        """Writes the per-camera aggregates to a CSV file."""
+        summary = self.per_camera()
+        names = list(summary)
+        rows = zip(*(summary[name].tolist() for name in names))
+
+        def write(tmp_path):
+            with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(names)
+                for row in rows:
+                    writer.writerow([f"{value:.3f}" if isinstance(value, float) else value for value in row])
+        self._atomic_write(path, write)
+
+    def dump(self):
+        """
+        Writes '<dump_path>.npz' and '<dump_path>_summary.csv' in the calling
+        thread, after any periodic dump still in progress.
+        """
+        with self._dump_lock:
+            self._write_dump()
+
+    def _write_dump(self):
+        if not self.dump_path:
+            return
+        try:
+            self.save_npz(f"{self.dump_path}.npz")
+            self.save_summary_csv(f"{self.dump_path}_summary.csv")
+            logger.info(f"Dumped run statistics for {self._size} captures to {self.dump_path}")
+        except OSError as e:
+            logger.error(f"Failed to dump run statistics: {e}")
+
+    @staticmethod
+    def _atomic_write(path: str, write):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        # A unique temporary name, so writers of the same path never share one.
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        if path.endswith(".npz"):
+            # np.savez appends '.npz' to names without it.
+            tmp_path = f"{path[:-4]}.{uuid.uuid4().hex[:8]}.tmp.npz"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Don't leave a partial temporary file behind for every failed dump.
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,59 @@
+"""
+Coalescing of concurrent calls that would compute the same value.
+
+The first caller for a key runs the computation; callers arriving while it is in
+flight wait for and share its result (or exception). No lock is held while the
+computation runs, so calls for different keys proceed in parallel.
+"""
+
+import threading
+from typing import Dict, Optional
+
+
+class _Call:
+    """An in-flight call shared by every caller of the same key."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into a single execution.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[object, _Call] = {}
+
+    def do(self, key, fn):
+        """
+        Runs `fn()` unless a call for `key` is already in flight, in which case
+        its result is awaited instead.
+
+        Returns:
+            A tuple of (result, shared) where `shared` is True if the result came
+            from another caller's execution.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
@@ -0,0 +1,190 @@
+"""
+Lightweight tracing for capture attempts.
+
+A trace groups the spans (connect, read, convert, validate, encode, write) of a
+single capture attempt under one trace id. The active trace is carried in a
+context variable, so RTSPClient and ImageProcessor only need to open spans on the
+global `tracer`; they join whatever trace the caller started. Outside of a trace,
+`tracer.span()` is a no-op.
+
+Finished traces are exported to a local JSON-lines file, one span per line.
+Traces are head-sampled at `sample_rate`, and any trace slower than
+`slow_trace_ms` is exported regardless, so tail latency is always visible.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+from src.utils.logger import logger
+
+
+@dataclass
+class Span:
+    """
+    A single timed operation within a trace.
+
+    Attributes:
+        name (str): The operation name (e.g. 'connect', 'encode').
+        trace_id (str): The id shared by every span of the capture attempt.
+        span_id (str): The unique id of this span.
+        parent_id (Optional[str]): The id of the enclosing span, if any.
+        start_time (float): Wall-clock start time (seconds since the epoch).
+        duration_ms (float): Duration measured with a monotonic clock.
+        status (str): 'ok' or 'error'.
+        attributes (Dict[str, Any]): Extra key/value pairs, e.g. camera_id.
+    """
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_time: float
+    duration_ms: float = 0.0
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class _TraceContext:
+    """Mutable state of the trace that is currently active."""
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.lock = threading.Lock()
+
+
+_current_trace: ContextVar[Optional[_TraceContext]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class JsonLinesSpanExporter:
+    """Appends finished spans to a JSON-lines file."""
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def export(self, spans: List[Span]):
+        lines = "".join(json.dumps(asdict(span), default=str) + "\n" for span in spans)
+        with self._lock:
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+class Tracer:
+    """
+    Creates traces and spans and hands finished traces to an exporter.
+
+    A tracer without an exporter still propagates trace ids and keeps the spans of
+    the active trace in memory (see `current_spans`), but exports nothing.
+    """
+    def __init__(self, exporter=None, sample_rate: float = 1.0, slow_trace_ms: Optional[float] = None):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_trace_ms = slow_trace_ms
+
+    def configure(self, file_path: Optional[str] = None, sample_rate: float = 1.0,
+                  slow_trace_ms: Optional[float] = None):
+        """(Re)configures the exporter and sampling policy."""
+        self.exporter = JsonLinesSpanExporter(file_path) if file_path else None
+        self.sample_rate = sample_rate
+        self.slow_trace_ms = slow_trace_ms
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current_trace_id(self) -> Optional[str]:
+        """Returns the id of the active trace, or None outside a trace."""
+        context = _current_trace.get()
+        return context.trace_id if context else None
+
+    def current_span(self) -> Optional[Span]:
+        """Returns the innermost open span (so callers may tag it), or None outside a trace."""
+        return _current_span.get()
+
+    def current_spans(self) -> List[Span]:
+        """Returns the spans finished so far in the active trace (empty outside a trace)."""
+        context = _current_trace.get()
+        if context is None:
+            return []
+        with context.lock:
+            return list(context.spans)
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        """
+        Starts a new trace whose root span is `name`.
+        Nested calls inside an active trace become ordinary spans.
+        """
+        if _current_trace.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        sampled = self.enabled and random.random() < self.sample_rate
+        context = _TraceContext(uuid.uuid4().hex, sampled)
+        token = _current_trace.set(context)
+        try:
+            with self.span(name, **attributes) as root:
+                yield root
+        finally:
+            _current_trace.reset(token)
+            self._finish(context, root)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Times a block as a child of the current span.
+        Yields the Span (so callers may add attributes), or None outside a trace.
+        """
+        context = _current_trace.get()
+        if context is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=context.trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=dict(attributes),
+        )
+        token = _current_span.set(span)
+        start = time.monotonic()
+        try:
+            yield span
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            span.duration_ms = (time.monotonic() - start) * 1000
+            _current_span.reset(token)
+            with context.lock:
+                context.spans.append(span)
+
+    def _finish(self, context: _TraceContext, root: Span):
+        if self.exporter is None:
+            return
+        is_slow = self.slow_trace_ms is not None and root.duration_ms >= self.slow_trace_ms
+        if not (context.sampled or is_slow):
+            return
+        try:
+            self.exporter.export(context.spans)
+        except OSError as e:
+            logger.error(f"Failed to export trace {context.trace_id}: {e}")
+
+
+# Global tracer instance; disabled until configured.
+tracer = Tracer()
@@ -0,0 +1,114 @@
+import unittest
+import json
+import os
+import tempfile
+import numpy as np
+from unittest.mock import MagicMock
+from src.core.capture_engine import CaptureEngine
+from src.core.state_machine import CaptureState
+from src.models.camera_models import CameraConfig, ProbeResult
+from src.camera.health_prober import HealthCache
+from src.utils.run_stats import CaptureRunStats
+from src.utils.tracing import tracer
+
+class TestCaptureEngine(unittest.TestCase):
+
+    def setUp(self):
+        """Set up for the tests."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = CameraConfig(
+            ip="127.0.0.1",
+            username="testuser",
+            password="testpassword",
+            camera_id="test_cam",
+            retry_count=1
+        )
+        self.client = MagicMock()
+        self.client.connect.return_value = True
+        self.client.capture_frame.return_value = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.tmp_dir.cleanup()
+
+    def _engine(self):
+        return CaptureEngine(self.config, output_dir=self.tmp_dir.name, client_factory=lambda config: self.client)
+
+    def test_capture_success(self):
+        """Test a successful capture writes an image and resets the state machine."""
+        engine = self._engine()
+        result = engine.capture_image()
+
+        self.assertTrue(result.success)
+        self.assertTrue(os.path.exists(result.image_info.file_path))
+        self.assertEqual(engine.state_machine.current_state, CaptureState.DISCONNECTED)
+        self.client.disconnect.assert_called_once()
+
+    def test_capture_retries_then_fails(self):
+        """Test connect failures are retried retry_count times."""
+        self.client.connect.return_value = False
+        engine = self._engine()
+        result = engine.capture_image()
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.error_message, "Failed to connect to camera")
+        self.assertEqual(self.client.connect.call_count, 2)
+        self.assertEqual(engine.state_machine.current_state, CaptureState.DISCONNECTED)
+
+    def test_records_run_stats(self):
+        """Test captures are recorded as columnar rows with stage timings."""
+        run_stats = CaptureRunStats()
+        engine = CaptureEngine(
+            self.config, output_dir=self.tmp_dir.name,
+            client_factory=lambda config: self.client, run_stats=run_stats
+        )
+        result = engine.capture_image()
+
+        columns = run_stats.columns()
+        self.assertEqual(len(run_stats), 1)
+        self.assertTrue(columns["success"][0])
+        self.assertEqual(columns["bytes_written"][0], result.image_info.size)
+        self.assertFalse(np.isnan(columns["encode_ms"][0]))
+        self.assertFalse(np.isnan(columns["write_ms"][0]))
+
+    def test_each_attempt_is_a_span(self):
+        """Test retries are separate attempt spans of one trace, and stage timings come from the last attempt."""
+        self.client.connect.side_effect = [False, True]
+        run_stats = CaptureRunStats()
+        engine = CaptureEngine(
+            self.config, output_dir=self.tmp_dir.name,
+            client_factory=lambda config: self.client, run_stats=run_stats
+        )
+        trace_file = os.path.join(self.tmp_dir.name, "traces.jsonl")
+        tracer.configure(file_path=trace_file)
+        try:
+            self.assertTrue(engine.capture_image().success)
+        finally:
+            tracer.configure()
+
+        with open(trace_file, encoding="utf-8") as f:
+            spans = [json.loads(line) for line in f]
+        attempts = [s for s in spans if s["name"] == "attempt"]
+        self.assertEqual([s["attributes"]["attempt"] for s in attempts], [1, 2])
+        self.assertEqual([s["status"] for s in attempts], ["error", "ok"])
+        self.assertEqual(len({s["trace_id"] for s in spans}), 1)
+        write = next(s for s in spans if s["name"] == "write")
+        self.assertEqual(write["parent_id"], attempts[1]["span_id"])
+        self.assertAlmostEqual(run_stats.columns()["write_ms"][0], write["duration_ms"], places=3)
+
+    def test_skips_camera_known_to_be_down(self):
+        """Test a fresh failed probe short-circuits the capture."""
+        cache = HealthCache()
+        cache.put(ProbeResult(camera_id="test_cam", reachable=False, error="Timed out", checked_at=cache._clock()))
+        engine = CaptureEngine(
+            self.config, output_dir=self.tmp_dir.name,
+            client_factory=lambda config: self.client, health_cache=cache
+        )
+        result = engine.capture_image()
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.error_message, "Skipped: Timed out")
+        self.client.connect.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -67,5 +67,21 @@ class TestConfigManager(unittest.TestCase):
             with self.assertRaises(ValueError):
                  ConfigManager()
 
+    def test_get_camera_configs_fleet(self):
+        """Test a 'cameras' list is returned alongside the single 'camera'."""
+        fleet_config = dict(self.config_data)
+        fleet_config["cameras"] = [dict(self.config_data["camera"], camera_id="cam2", ip="127.0.0.2")]
+        with patch.object(ConfigManager, '_load_from_file', return_value=fleet_config):
+            manager = ConfigManager()
+            self.assertEqual([c.camera_id for c in manager.get_camera_configs()], ["test_cam", "cam2"])
+
+    def test_validate_config_duplicate_camera_id(self):
+        """Test validation failure for duplicate camera ids."""
+        fleet_config = dict(self.config_data)
+        fleet_config["cameras"] = [dict(self.config_data["camera"])]
+        with patch.object(ConfigManager, '_load_from_file', return_value=fleet_config):
+            with self.assertRaises(ValueError):
+                ConfigManager()
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,109 @@
+import unittest
+import threading
+import time
+from unittest.mock import patch
+from src.utils.encode_cache import EncodedImageCache
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestEncodedImageCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up for the tests."""
+        self.clock = FakeClock()
+        self.cache = EncodedImageCache(max_bytes=100, max_age_seconds=10, clock=self.clock)
+
+    def test_hit_and_miss(self):
+        """Test hits and misses are counted."""
+        self.assertIsNone(self.cache.get(("cam1", 1, "jpg@full", 90)))
+        self.cache.put(("cam1", 1, "jpg@full", 90), b"x" * 10)
+        self.assertEqual(self.cache.get(("cam1", 1, "jpg@full", 90)), b"x" * 10)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["bytes"]), (1, 1, 10))
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        """Test the byte budget evicts the least recently used entry."""
+        self.cache.put("a", b"a" * 40)
+        self.cache.put("b", b"b" * 40)
+        self.cache.get("a")
+        self.cache.put("c", b"c" * 40)
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.assertEqual(self.cache.stats()["bytes"], 80)
+
+    def test_oversized_entries_are_not_cached(self):
+        """Test an entry larger than the budget is skipped."""
+        self.cache.put("big", b"x" * 101)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_entries_expire_by_age(self):
+        """Test entries older than max_age_seconds are dropped."""
+        self.cache.put("a", b"a")
+        self.clock.now = 11
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+        self.assertEqual(self.cache.stats()["bytes"], 0)
+
+    def test_get_or_encode_coalesces_concurrent_misses(self):
+        """Test concurrent misses for one key encode once, without blocking other keys."""
+        cache = EncodedImageCache()
+        calls = []
+        release = threading.Event()
+
+        def slow_encode():
+            calls.append(1)
+            release.wait(2)
+            return b"jpeg"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_encode("slow", slow_encode)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        # A different key is served while the slow encode is still running.
+        self.assertEqual(cache.get_or_encode("fast", lambda: b"png"), b"png")
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b"jpeg"] * 4)
+        stats = cache.stats()
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["coalesced"], 3)
+
+    def test_get_or_encode_rechecks_inside_the_flight(self):
+        """Test a caller that missed just before another flight stored the key does not encode again."""
+        cache = EncodedImageCache()
+        original_lookup = cache._lookup
+
+        def lookup_racing_another_flight(key):
+            data = original_lookup(key)
+            if data is None and not cache._entries:
+                cache.put(key, b"stored by another flight")
+            return data
+
+        with patch.object(cache, "_lookup", side_effect=lookup_racing_another_flight):
+            data = cache.get_or_encode("a", lambda: self.fail("encoded twice"))
+        self.assertEqual(data, b"stored by another flight")
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 0))
+
+    def test_failed_encodes_are_not_cached(self):
+        """Test None results are returned but not stored."""
+        self.assertIsNone(self.cache.get_or_encode("a", lambda: None))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
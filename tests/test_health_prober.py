@@ -0,0 +1,232 @@
+import unittest
+import socket
+import socketserver
+import threading
+import hashlib
+from unittest.mock import patch
+from src.camera.health_prober import HealthCache, HealthProber, _parse_challenge
+from src.models.camera_models import CameraConfig, ProbeResult
+
+REALM = "IP Camera"
+NONCE = "abc123"
+
+def _md5(text):
+    return hashlib.md5(text.encode()).hexdigest()
+
+class FakeRTSPHandler(socketserver.StreamRequestHandler):
+    """
+    Answers OPTIONS and a Digest-protected DESCRIBE like a typical IP camera.
+    The server can also protect OPTIONS, or answer DESCRIBE with a fixed status.
+    """
+    def handle(self):
+        while True:
+            request_line = self.rfile.readline().decode().strip()
+            if not request_line:
+                return
+            headers = {}
+            while True:
+                line = self.rfile.readline().decode().strip()
+                if not line:
+                    break
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+            method, uri, _ = request_line.split(" ")
+            cseq = headers.get("cseq", "0")
+
+            if self.server.silent:
+                continue
+            auth = headers.get("authorization")
+            if method == "OPTIONS" and self.server.protect_options and not (auth and self._check(auth, method, uri)):
+                self._challenge(cseq)
+            elif method == "OPTIONS":
+                self._reply(f"RTSP/1.0 200 OK\r\nCSeq: {cseq}\r\nPublic: OPTIONS, DESCRIBE\r\n\r\n")
+            elif method == "DESCRIBE" and self.server.describe_status:
+                status = self.server.describe_status
+                self._reply(f"RTSP/1.0 {status}\r\nCSeq: {cseq}\r\n\r\n")
+            elif method == "DESCRIBE":
+                if auth and self._check(auth, method, uri):
+                    body = "v=0\r\ns=fake\r\n"
+                    self._reply(
+                        f"RTSP/1.0 200 OK\r\nCSeq: {cseq}\r\nContent-Type: application/sdp\r\n"
+                        f"Content-Length: {len(body)}\r\n\r\n{body}"
+                    )
+                else:
+                    self._challenge(cseq)
+
+    def _challenge(self, cseq):
+        self._reply(
+            f"RTSP/1.0 401 Unauthorized\r\nCSeq: {cseq}\r\n"
+            f'WWW-Authenticate: Digest realm="{REALM}", nonce="{NONCE}"\r\n\r\n'
+        )
+
+    def _check(self, auth, method, uri):
+        params = _parse_challenge(auth)
+        expected = _md5(f"{_md5(f'admin:{REALM}:secret')}:{NONCE}:{_md5(f'{method}:{uri}')}")
+        return params.get("response") == expected
+
+    def _reply(self, text):
+        self.wfile.write(text.encode())
+
+class FakeRTSPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, silent=False, protect_options=False, describe_status=None, host="127.0.0.1"):
+        if ":" in host:
+            self.address_family = socket.AF_INET6
+        super().__init__((host, 0), FakeRTSPHandler)
+        self.silent = silent
+        self.protect_options = protect_options
+        self.describe_status = describe_status
+
+class TestHealthProber(unittest.TestCase):
+
+    def setUp(self):
+        """Start a fake RTSP server on a free local port."""
+        self.server = FakeRTSPServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        """Stop the fake server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _config(self, camera_id, password="secret", port=None, ip="127.0.0.1"):
+        return CameraConfig(
+            ip=ip,
+            port=port or self.port,
+            username="admin",
+            password=password,
+            camera_id=camera_id,
+            rtsp_path="stream_main"
+        )
+
+    def _closed_port(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+    def test_probe_auth_ok(self):
+        """Test a camera accepting Digest credentials is healthy."""
+        results = HealthProber(timeout=2.0).probe([self._config("cam1")])
+        result = results["cam1"]
+        self.assertTrue(result.reachable)
+        self.assertTrue(result.auth_ok)
+        self.assertEqual(result.status_code, 200)
+        self.assertIsNotNone(result.rtt_ms)
+        self.assertTrue(result.is_healthy)
+
+    def test_probe_auth_failure(self):
+        """Test wrong credentials are reported as an auth failure."""
+        result = HealthProber(timeout=2.0).probe([self._config("cam1", password="wrong")])["cam1"]
+        self.assertTrue(result.reachable)
+        self.assertFalse(result.auth_ok)
+        self.assertEqual(result.status_code, 401)
+        self.assertFalse(result.is_healthy)
+
+    def test_probe_auth_ok_with_protected_options(self):
+        """Test a camera challenging both OPTIONS and DESCRIBE is healthy with the right credentials."""
+        result = self._probe_fake_server(protect_options=True)
+        self.assertTrue(result.auth_ok)
+        self.assertEqual(result.status_code, 200)
+        self.assertTrue(result.is_healthy)
+
+    def test_probe_auth_failure_with_protected_options(self):
+        """Test wrong credentials are still rejected when OPTIONS is protected."""
+        result = self._probe_fake_server(protect_options=True, password="wrong")
+        self.assertFalse(result.auth_ok)
+        self.assertEqual(result.status_code, 401)
+        self.assertFalse(result.is_healthy)
+
+    def test_probe_error_status_is_unhealthy(self):
+        """Test a camera answering DESCRIBE with 404 or 503 is reported as down."""
+        for status in ("404 Not Found", "503 Service Unavailable"):
+            with self.subTest(status=status):
+                result = self._probe_fake_server(describe_status=status)
+                self.assertTrue(result.reachable)
+                self.assertEqual(result.status_code, int(status[:3]))
+                self.assertIn("Unexpected status", result.error)
+                self.assertFalse(result.is_healthy)
+
+    def test_probe_ipv6(self):
+        """Test an IPv6 camera is probed over an IPv6 socket."""
+        if not socket.has_ipv6:
+            self.skipTest("IPv6 is not available")
+        result = self._probe_fake_server(host="::1")
+        self.assertTrue(result.is_healthy)
+
+    def test_hosts_are_resolved_once_before_probing(self):
+        """Test each host is looked up once, and a failed lookup only fails its own cameras."""
+        real_getaddrinfo = socket.getaddrinfo
+
+        def getaddrinfo(host, *args, **kwargs):
+            if host == "camera.invalid":
+                raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+            return real_getaddrinfo(host, *args, **kwargs)
+
+        configs = [self._config(f"cam{i}") for i in range(3)]
+        configs.append(self._config("unknown", ip="camera.invalid"))
+        with patch("socket.getaddrinfo", side_effect=getaddrinfo) as lookup:
+            results = HealthProber(timeout=2.0).probe(configs)
+
+        self.assertEqual(lookup.call_count, 2)
+        self.assertEqual(sum(r.is_healthy for r in results.values()), 3)
+        self.assertIn("Resolve failed", results["unknown"].error)
+
+    def _probe_fake_server(self, password="secret", host="127.0.0.1", **server_options):
+        server = FakeRTSPServer(host=host, **server_options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            config = self._config("cam1", password=password, port=server.server_address[1], ip=host)
+            return HealthProber(timeout=2.0).probe([config])["cam1"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_probe_connection_refused(self):
+        """Test an unreachable camera is reported as down."""
+        result = HealthProber(timeout=2.0).probe([self._config("cam1", port=self._closed_port())])["cam1"]
+        self.assertFalse(result.reachable)
+        self.assertIn("Connect failed", result.error)
+
+    def test_probe_timeout(self):
+        """Test a camera that never answers times out."""
+        silent = FakeRTSPServer(silent=True)
+        threading.Thread(target=silent.serve_forever, daemon=True).start()
+        try:
+            config = self._config("cam1", port=silent.server_address[1])
+            result = HealthProber(timeout=0.2).probe([config])["cam1"]
+        finally:
+            silent.shutdown()
+            silent.server_close()
+        self.assertFalse(result.reachable)
+        self.assertEqual(result.error, "Timed out")
+
+    def test_probe_many_cameras_concurrently(self):
+        """Test many cameras are probed in one call, with bounded concurrency."""
+        configs = [self._config(f"cam{i}") for i in range(50)]
+        configs.append(self._config("down", port=self._closed_port()))
+        cache = HealthCache()
+        results = HealthProber(timeout=5.0, max_concurrency=16, cache=cache).probe(configs)
+
+        self.assertEqual(len(results), 51)
+        self.assertEqual(sum(r.is_healthy for r in results.values()), 50)
+        self.assertTrue(cache.is_known_down("down"))
+        self.assertFalse(cache.is_known_down("cam0"))
+
+class TestHealthCache(unittest.TestCase):
+
+    def test_ttl_expiry(self):
+        """Test cached results expire after the TTL."""
+        now = [0.0]
+        cache = HealthCache(ttl_seconds=10, clock=lambda: now[0])
+        cache.put(ProbeResult(camera_id="cam1", reachable=False, checked_at=0.0))
+        self.assertTrue(cache.is_known_down("cam1"))
+
+        now[0] = 11.0
+        self.assertIsNone(cache.get("cam1"))
+        self.assertFalse(cache.is_known_down("cam1"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,9 @@ import unittest
 import os
 import cv2
 import numpy as np
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, mock_open
 from src.utils.image_processor import ImageProcessor
+from src.utils.encode_cache import EncodedImageCache
 
 class TestImageProcessor(unittest.TestCase):
 
@@ -30,23 +31,25 @@ class TestImageProcessor(unittest.TestCase):
         self.assertFalse(ImageProcessor.validate_image(self.invalid_frame))
         self.assertFalse(ImageProcessor.validate_image(np.array([])))
 
+    @patch("builtins.open", new_callable=mock_open)
     @patch("os.makedirs")
-    @patch("cv2.imwrite")
-    def test_save_image_success(self, mock_imwrite, mock_makedirs):
+    @patch("cv2.imencode")
+    def test_save_image_success(self, mock_imencode, mock_makedirs, mock_file):
         """Test successful image saving."""
-        mock_imwrite.return_value = True
+        mock_imencode.return_value = (True, np.frombuffer(b"jpeg", dtype=np.uint8))
         
         filepath = ImageProcessor.save_image(self.valid_frame, directory=self.output_dir)
         
         self.assertIsNotNone(filepath)
-        mock_makedirs.assert_called_once_with(self.output_dir)
-        mock_imwrite.assert_called_once()
+        mock_makedirs.assert_called_once_with(self.output_dir, exist_ok=True)
+        mock_imencode.assert_called_once()
+        mock_file().write.assert_called_once_with(b"jpeg")
         self.assertTrue(filepath.startswith(self.output_dir))
 
-    @patch("cv2.imwrite")
-    def test_save_image_failure(self, mock_imwrite):
+    @patch("cv2.imencode")
+    def test_save_image_failure(self, mock_imencode):
         """Test failure in image saving."""
-        mock_imwrite.return_value = False
+        mock_imencode.return_value = (False, None)
         
         filepath = ImageProcessor.save_image(self.valid_frame, directory=self.output_dir)
         self.assertIsNone(filepath)
@@ -56,5 +59,50 @@ class TestImageProcessor(unittest.TestCase):
         filepath = ImageProcessor.save_image(self.invalid_frame, directory=self.output_dir)
         self.assertIsNone(filepath)
 
+    @patch("src.utils.image_processor.datetime")
+    def test_save_image_names_are_collision_free(self, mock_datetime):
+        """Test the node id is part of the name and clashing names get a suffix."""
+        mock_datetime.now.return_value.strftime.return_value = "20260101_000000_000000"
+        first = ImageProcessor.save_image(self.valid_frame, directory=self.output_dir, node_id="node-1")
+        second = ImageProcessor.save_image(self.valid_frame, directory=self.output_dir, node_id="node-1")
+
+        self.assertTrue(first.endswith("20260101_000000_000000_cam1_node-1.jpg"))
+        self.assertTrue(second.endswith("20260101_000000_000000_cam1_node-1_1.jpg"))
+        self.assertEqual(len(os.listdir(self.output_dir)), 2)
+
+    def test_save_image_directory_created_concurrently(self):
+        """Test a directory created by another node between the check and makedirs is not an error."""
+        os.makedirs(self.output_dir)
+        with patch("os.path.exists", return_value=False):
+            filepath = ImageProcessor.save_image(self.valid_frame, directory=self.output_dir)
+        self.assertIsNotNone(filepath)
+
+    def test_encode_image_jpeg(self):
+        """Test encoding a frame to JPEG bytes in memory."""
+        data = ImageProcessor.encode_image(self.valid_frame, "jpg", 80)
+        self.assertIsInstance(data, bytes)
+        self.assertTrue(data.startswith(b"\xff\xd8"))
+
+    def test_encode_image_unsupported_format(self):
+        """Test encoding with an unsupported format."""
+        self.assertIsNone(ImageProcessor.encode_image(self.valid_frame, "gif"))
+
+    def test_encode_image_resize(self):
+        """Test encoding to a smaller rendition."""
+        data = ImageProcessor.encode_image(self.valid_frame, "png", size=(20, 10))
+        decoded = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(decoded.shape, (10, 20, 3))
+
+    @patch("src.utils.image_processor.ImageProcessor.encode_image", return_value=b"jpeg")
+    def test_encode_image_cached(self, mock_encode):
+        """Test repeated encodes of the same frame and rendition hit the cache."""
+        cache = EncodedImageCache()
+        for _ in range(3):
+            data = ImageProcessor.encode_image_cached(self.valid_frame, "cam1", 7, "jpg", 80, cache=cache)
+        self.assertEqual(data, b"jpeg")
+        mock_encode.assert_called_once()
+        ImageProcessor.encode_image_cached(self.valid_frame, "cam1", 7, "jpg", 70, cache=cache)
+        self.assertEqual(mock_encode.call_count, 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
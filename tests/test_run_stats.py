@@ -0,0 +1,136 @@
+import unittest
+import os
+import csv
+import tempfile
+import threading
+import numpy as np
+from datetime import datetime
+from unittest.mock import patch
+from src.models.camera_models import CaptureResult, ImageInfo
+from src.utils.run_stats import CaptureRunStats
+
+class TestCaptureRunStats(unittest.TestCase):
+
+    def setUp(self):
+        """Set up for the tests."""
+        self.stats = CaptureRunStats(initial_capacity=2)
+
+    def test_columns_grow(self):
+        """Test appends beyond the initial capacity keep every row."""
+        for i in range(10):
+            self.stats.record(f"cam{i % 3}", True, float(i), {"connect": 1.0}, bytes_written=100, timestamp=i)
+        columns = self.stats.columns()
+        self.assertEqual(len(self.stats), 10)
+        np.testing.assert_array_equal(columns["timestamp"], np.arange(10))
+        np.testing.assert_array_equal(columns["camera_index"][:4], [0, 1, 2, 0])
+        self.assertTrue(np.isnan(columns["encode_ms"]).all())
+
+    def test_per_camera_aggregates(self):
+        """Test success rates, percentiles and stage means per camera."""
+        for latency in (10, 20, 30, 40, 50):
+            self.stats.record("cam1", True, latency, {"connect": latency / 10}, bytes_written=10)
+        self.stats.record("cam1", False, 999)
+        self.stats.record("cam2", False, 5)
+
+        summary = self.stats.per_camera()
+        self.assertEqual(list(summary["camera_id"]), ["cam1", "cam2"])
+        np.testing.assert_array_equal(summary["captures"], [6, 1])
+        np.testing.assert_allclose(summary["success_rate"], [5 / 6, 0.0])
+        self.assertEqual(summary["p50_ms"][0], 30)
+        self.assertAlmostEqual(summary["p95_ms"][0], 48)
+        self.assertAlmostEqual(summary["mean_connect_ms"][0], 3.0)
+        self.assertTrue(np.isnan(summary["p50_ms"][1]))
+        np.testing.assert_array_equal(summary["bytes_written"], [50, 0])
+
+    def test_percentiles_match_numpy(self):
+        """Test the vectorized grouped percentiles agree with np.percentile."""
+        rng = np.random.default_rng(0)
+        values = {f"cam{i}": rng.exponential(50, size=rng.integers(1, 200)) for i in range(20)}
+        for camera_id, latencies in values.items():
+            for latency in latencies:
+                self.stats.record(camera_id, True, latency)
+
+        summary = self.stats.per_camera(percentiles=(50, 99))
+        for index, camera_id in enumerate(summary["camera_id"]):
+            latencies = values[camera_id].astype(np.float32)
+            self.assertAlmostEqual(summary["p99_ms"][index], np.percentile(latencies, 99), places=3)
+
+    def test_dump(self):
+        """Test dumps write the raw columns and a per-camera CSV summary."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base = os.path.join(tmp_dir, "stats", "run")
+            stats = CaptureRunStats(dump_path=base)
+            stats.record("cam1", True, 12.5, bytes_written=42)
+            stats.dump()
+
+            data = np.load(f"{base}.npz")
+            self.assertEqual(list(data["camera_ids"]), ["cam1"])
+            self.assertEqual(data["bytes_written"][0], 42)
+            with open(f"{base}_summary.csv") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(rows[0]["camera_id"], "cam1")
+            self.assertEqual(rows[0]["p50_ms"], "12.500")
+
+    def test_failed_dump_leaves_no_temporary_file(self):
+        """Test a dump that fails mid-write removes its temporary file and keeps the previous dump."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base = os.path.join(tmp_dir, "run")
+            stats = CaptureRunStats(dump_path=base)
+            stats.record("cam1", True, 12.5)
+            stats.dump()
+
+            with patch("csv.writer", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    stats.save_summary_csv(f"{base}_summary.csv")
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ["run.npz", "run_summary.csv"])
+            with open(f"{base}_summary.csv") as f:
+                self.assertEqual(next(csv.DictReader(f))["camera_id"], "cam1")
+
+    def test_periodic_dump(self):
+        """Test record() dumps once the interval has elapsed."""
+        now = [0.0]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base = os.path.join(tmp_dir, "run")
+            stats = CaptureRunStats(dump_path=base, dump_interval_s=10, clock=lambda: now[0])
+            stats.record("cam1", True, 1.0)
+            self.assertFalse(os.path.exists(f"{base}.npz"))
+            now[0] = 10.0
+            stats.record("cam1", True, 1.0)
+            stats.wait_for_dump(5)
+            self.assertTrue(os.path.exists(f"{base}.npz"))
+
+    def test_periodic_dump_runs_off_the_capture_thread(self):
+        """Test record() does not wait for a periodic dump, and overlapping dumps are skipped."""
+        now = [0.0]
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_dump():
+            calls.append(threading.current_thread().name)
+            started.set()
+            release.wait(5)
+
+        stats = CaptureRunStats(dump_path="unused", dump_interval_s=10, clock=lambda: now[0])
+        with patch.object(stats, "_write_dump", side_effect=slow_dump):
+            now[0] = 10.0
+            stats.record("cam1", True, 1.0)
+            self.assertTrue(started.wait(5))
+            now[0] = 20.0
+            stats.record("cam1", True, 1.0)
+            release.set()
+            stats.wait_for_dump(5)
+
+        self.assertEqual(calls, ["run-stats-dump"])
+        self.assertEqual(len(stats), 2)
+
+class TestSlottedModels(unittest.TestCase):
+
+    def test_models_have_no_instance_dict(self):
+        """Test per-capture models are slotted."""
+        info = ImageInfo(timestamp=datetime.now(), file_path="a.jpg", size=1, format="JPEG")
+        result = CaptureResult(success=True, image_info=info)
+        self.assertFalse(hasattr(info, "__dict__"))
+        self.assertFalse(hasattr(result, "__dict__"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from src.core.sharding import ShardPlan, node_names, rank_nodes
+from src.models.camera_models import CameraConfig
+
+def make_cameras(count, heavy_every=10):
+    return [
+        CameraConfig(
+            ip="127.0.0.1",
+            username="u",
+            password="p",
+            camera_id=f"cam{i:04d}",
+            decode_cost=4.0 if i % heavy_every == 0 else 1.0
+        )
+        for i in range(count)
+    ]
+
+class TestShardPlan(unittest.TestCase):
+
+    def setUp(self):
+        """Set up for the tests."""
+        self.cameras = make_cameras(400)
+
+    def test_plan_is_deterministic(self):
+        """Test every node computes the same plan, regardless of input order."""
+        first = ShardPlan.build(self.cameras, node_names(4))
+        second = ShardPlan.build(list(reversed(self.cameras)), node_names(4))
+        self.assertEqual(first.assignment, second.assignment)
+
+    def test_every_camera_assigned_once(self):
+        """Test the shards partition the cameras."""
+        plan = ShardPlan.build(self.cameras, ["a", "b", "c"])
+        owned = [cid for node in plan.nodes for cid in plan.cameras_for(node)]
+        self.assertEqual(sorted(owned), sorted(c.camera_id for c in self.cameras))
+
+    def test_adding_a_node_moves_about_one_nth(self):
+        """Test growing from 4 to 5 nodes moves roughly 1/5 of the cameras."""
+        for load_factor in (None, 1.25):
+            before = ShardPlan.build(self.cameras, node_names(4), load_factor=load_factor)
+            after = ShardPlan.build(self.cameras, node_names(5), load_factor=load_factor)
+            moved = sum(before.assignment[cid] != after.assignment[cid] for cid in before.assignment)
+            self.assertLess(moved, len(self.cameras) * 0.3, f"load_factor={load_factor}")
+            if load_factor is None:
+                # Plain rendezvous hashing only moves cameras onto the new node.
+                self.assertTrue(all(
+                    after.assignment[cid] == "node-4"
+                    for cid in before.assignment if before.assignment[cid] != after.assignment[cid]
+                ))
+
+    def test_load_factor_bounds_cost(self):
+        """Test no node exceeds load_factor times its fair share of decode cost."""
+        plan = ShardPlan.build(self.cameras, node_names(5), load_factor=1.1)
+        fair_share = sum(plan.costs.values()) / 5
+        self.assertLessEqual(max(plan.load().values()), fair_share * 1.1 + 1e-9)
+
+    def test_node_weights(self):
+        """Test a node with twice the weight receives about twice the cameras."""
+        plan = ShardPlan.build(make_cameras(2000, heavy_every=10 ** 9), ["big", "small"],
+                               weights={"big": 2.0}, load_factor=None)
+        ratio = len(plan.cameras_for("big")) / len(plan.cameras_for("small"))
+        self.assertAlmostEqual(ratio, 2.0, delta=0.3)
+
+    def test_rank_nodes_is_a_permutation(self):
+        """Test ranking returns every node once."""
+        self.assertEqual(sorted(rank_nodes("cam1", ["a", "b", "c"])), ["a", "b", "c"])
+
+    def test_invalid_nodes(self):
+        """Test empty or duplicate node lists are rejected."""
+        with self.assertRaises(ValueError):
+            ShardPlan.build(self.cameras, [])
+        with self.assertRaises(ValueError):
+            ShardPlan.build(self.cameras, ["a", "a"])
+
+    def test_format(self):
+        """Test the printed plan lists every node and its load."""
+        text = ShardPlan.build(self.cameras, node_names(2)).format(show_cameras=True)
+        self.assertIn("node-0:", text)
+        self.assertIn("node-1:", text)
+        self.assertIn("cam0000 (4)", text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,278 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+import urllib.error
+import numpy as np
+from src.core.snapshot_service import SnapshotService, SnapshotError, create_snapshot_server
+from src.utils.single_flight import SingleFlight
+from src.models.camera_models import CameraConfig
+from src.utils.encode_cache import EncodedImageCache
+from src.utils.tracing import tracer
+
+class FakeClient:
+    """A camera client that returns a blank frame after a delay."""
+    instances = 0
+
+    def __init__(self, config, delay=0.01, fail=False):
+        FakeClient.instances += 1
+        self.config = config
+        self.delay = delay
+        self.fail = fail
+        self.frames = 0
+
+    def connect(self):
+        return True
+
+    def capture_frame(self):
+        time.sleep(self.delay)
+        if self.fail:
+            return None
+        self.frames += 1
+        return np.zeros((16, 16, 3), dtype=np.uint8)
+
+    def disconnect(self):
+        pass
+
+class ConstantClient(FakeClient):
+    """A camera client whose frames are filled with one value."""
+    def __init__(self, config, value):
+        super().__init__(config)
+        self.value = value
+
+    def capture_frame(self):
+        time.sleep(self.delay)
+        return np.full((16, 16, 3), self.value, dtype=np.uint8)
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_are_coalesced(self):
+        """Test concurrent callers of the same key share one execution."""
+        single_flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def work():
+            calls.append(1)
+            release.wait(2)
+            return "result"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(single_flight.do("cam1", work)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r for r, _ in results], ["result"] * 5)
+        self.assertEqual(sum(shared for _, shared in results), 4)
+
+    def test_errors_are_shared(self):
+        """Test the leader's exception is raised to every caller."""
+        single_flight = SingleFlight()
+        with self.assertRaises(SnapshotError):
+            single_flight.do("cam1", lambda: (_ for _ in ()).throw(SnapshotError("boom")))
+
+class TestSnapshotService(unittest.TestCase):
+
+    def setUp(self):
+        """Set up for the tests."""
+        self.config = CameraConfig(ip="127.0.0.1", username="u", password="p", camera_id="gate3")
+
+    def _service(self, **kwargs):
+        service = SnapshotService([self.config], **kwargs)
+        self.addCleanup(service.close)
+        return service
+
+    def test_max_age_serves_recent_snapshot(self):
+        """Test max_age_ms reuses the last frame and its cached encoding."""
+        cache = EncodedImageCache()
+        # Slow enough that no new frame arrives between the first two requests.
+        service = self._service(client_factory=lambda c: FakeClient(c, delay=0.3), cache=cache)
+        first = service.get_snapshot("gate3")
+        second = service.get_snapshot("gate3", max_age_ms=60000)
+        third = service.get_snapshot("gate3")
+
+        self.assertEqual(second.frame_seq, 1)
+        self.assertIs(first.data, second.data)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(third.frame_seq, 2)
+        self.assertTrue(first.data.startswith(b"\xff\xd8"))
+        stats = service.stats.snapshot()
+        self.assertEqual(stats["captures"], 2)
+        self.assertEqual(stats["fresh_hits"], 1)
+        self.assertEqual(stats["served"], 3)
+
+    def test_session_stays_warm(self):
+        """Test consecutive snapshots reuse one connected client."""
+        FakeClient.instances = 0
+        service = self._service(client_factory=FakeClient, cache=EncodedImageCache())
+        service.get_snapshot("gate3")
+        service.get_snapshot("gate3")
+        self.assertEqual(FakeClient.instances, 1)
+
+    def test_snapshots_are_live_frames(self):
+        """Test the reader keeps the stream drained, so a later snapshot is a new, recent frame."""
+        service = self._service(client_factory=lambda c: FakeClient(c, delay=0.02), cache=EncodedImageCache())
+        first = service.get_snapshot("gate3")
+        time.sleep(0.3)
+        requested_at = time.monotonic()
+        later = service.get_snapshot("gate3")
+
+        self.assertGreater(later.frame_seq, first.frame_seq + 5)
+        self.assertGreaterEqual(later.captured_at, requested_at)
+
+    def test_close_stops_reader(self):
+        """Test closing the service stops the session's reader thread."""
+        service = self._service(client_factory=FakeClient, cache=EncodedImageCache())
+        service.get_snapshot("gate3")
+        reader = service.sessions["gate3"]._reader
+        service.close()
+        self.assertFalse(reader.is_alive())
+        self.assertIsNone(service.sessions["gate3"].client)
+        with self.assertRaises(SnapshotError):
+            service.get_snapshot("gate3")
+
+    def test_failing_stream_raises(self):
+        """Test a stream that yields no frames fails the request instead of serving an old frame."""
+        service = self._service(client_factory=lambda c: FakeClient(c, fail=True), cache=EncodedImageCache())
+        with self.assertRaises(SnapshotError):
+            service.get_snapshot("gate3")
+        self.assertEqual(service.stats.snapshot()["errors"], 1)
+
+    def test_renditions_are_cached_separately(self):
+        """Test different widths and qualities of one frame are distinct cache entries."""
+        cache = EncodedImageCache()
+        service = self._service(client_factory=lambda c: FakeClient(c, delay=0.3), cache=cache)
+        service.get_snapshot("gate3")
+        small = service.get_snapshot("gate3", max_age_ms=60000, width=8)
+        service.get_snapshot("gate3", max_age_ms=60000, width=8)
+        service.get_snapshot("gate3", max_age_ms=60000, quality=50)
+
+        session_id = service.sessions["gate3"].session_id
+        self.assertNotEqual(small.data, cache.get(("gate3", (session_id, 1), "jpg@full", 90)))
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(stats["hits"], 2)
+
+    def test_services_sharing_a_cache_do_not_mix_frames(self):
+        """Test two sessions of the same camera never serve each other's cached encodes."""
+        cache = EncodedImageCache()
+        services = [
+            self._service(client_factory=lambda c, value=value: ConstantClient(c, value), cache=cache)
+            for value in (0, 255)
+        ]
+        dark, bright = (service.get_snapshot("gate3") for service in services)
+
+        self.assertEqual(dark.frame_seq, bright.frame_seq)
+        self.assertNotEqual(dark.data, bright.data)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_one_trace_per_request(self):
+        """Test a request's capture and encode spans share its trace, and cache hits emit no encode span."""
+        service = self._service(client_factory=lambda c: FakeClient(c, delay=0.3), cache=EncodedImageCache())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "traces.jsonl")
+            tracer.configure(file_path=trace_file)
+            try:
+                service.get_snapshot("gate3")
+                service.get_snapshot("gate3", max_age_ms=60000)
+            finally:
+                tracer.configure()
+            with open(trace_file, encoding="utf-8") as f:
+                spans = [json.loads(line) for line in f]
+
+        roots = [s for s in spans if s["parent_id"] is None]
+        self.assertEqual([r["name"] for r in roots], ["snapshot", "snapshot"])
+        first, second = ([s for s in spans if s["trace_id"] == r["trace_id"]] for r in roots)
+        self.assertEqual(sorted(s["name"] for s in first), ["encode", "snapshot", "wait_frame"])
+        self.assertFalse(roots[0]["attributes"]["encode_cache_hit"])
+        self.assertEqual([s["name"] for s in second], ["snapshot"])
+        self.assertTrue(roots[1]["attributes"]["encode_cache_hit"])
+        self.assertTrue(roots[1]["attributes"]["fresh_hit"])
+
+    def test_unknown_camera(self):
+        """Test unknown cameras raise KeyError."""
+        service = self._service(client_factory=FakeClient)
+        with self.assertRaises(KeyError):
+            service.get_snapshot("nope")
+
+class TestSnapshotServer(unittest.TestCase):
+
+    def setUp(self):
+        """Start a snapshot server on a free local port."""
+        config = CameraConfig(ip="127.0.0.1", username="u", password="p", camera_id="gate3")
+        broken = CameraConfig(ip="127.0.0.1", username="u", password="p", camera_id="broken")
+        factories = {
+            "gate3": lambda c: FakeClient(c, delay=0.2),
+            "broken": lambda c: FakeClient(c, fail=True),
+        }
+        self.service = SnapshotService(
+            [config, broken], client_factory=lambda c: factories[c.camera_id](c), cache=EncodedImageCache()
+        )
+        self.server = create_snapshot_server(self.service, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.close()
+
+    def _get(self, path):
+        with urllib.request.urlopen(self.base_url + path, timeout=5) as response:
+            return response.status, response.headers, response.read()
+
+    def test_concurrent_requests_share_one_capture(self):
+        """Test concurrent HTTP requests for one camera are coalesced."""
+        bodies = []
+        threads = [
+            threading.Thread(target=lambda: bodies.append(self._get("/cameras/gate3/snapshot")))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(bodies), 8)
+        self.assertTrue(all(status == 200 for status, _, _ in bodies))
+        self.assertEqual(bodies[0][1]["Content-Type"], "image/jpeg")
+        stats = self.service.stats.snapshot()
+        self.assertEqual(stats["served"], 8)
+        self.assertEqual(stats["captures"] + stats["coalesced"], 8)
+        self.assertLess(stats["captures"], 8)
+        self.assertEqual(stats["waiting"], 0)
+
+    def test_stats_endpoint(self):
+        """Test the /stats endpoint returns the counters."""
+        status, _, body = self._get("/stats")
+        self.assertEqual(status, 200)
+        stats = json.loads(body)
+        self.assertIn("coalesced", stats)
+        self.assertIn("hits", stats["encode_cache"])
+
+    def test_error_statuses(self):
+        """Test unknown cameras, bad parameters and capture failures."""
+        for path, expected in [
+            ("/cameras/nope/snapshot", 404),
+            ("/cameras/gate3/snapshot?max_age_ms=abc", 400),
+            ("/cameras/gate3/snapshot?quality=101", 400),
+            ("/cameras/broken/snapshot", 503),
+        ]:
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                self._get(path)
+            self.assertEqual(ctx.exception.code, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import unittest
+from src.core.state_machine import CaptureStateMachine, CaptureState, CaptureEvent
+from src.utils.monitor import HistogramRegistry
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class TestCaptureStateMachine(unittest.TestCase):
+
+    def setUp(self):
+        """Set up for the tests."""
+        self.clock = FakeClock()
+        self.histograms = HistogramRegistry()
+        self.sm = CaptureStateMachine(camera_id="cam1", histograms=self.histograms, clock=self.clock)
+
+    def test_valid_transition(self):
+        """Test a valid transition changes the state."""
+        self.assertEqual(self.sm.transition(CaptureEvent.START_CONNECT), CaptureState.CONNECTING)
+
+    def test_invalid_transition(self):
+        """Test an invalid transition raises ValueError and records nothing."""
+        with self.assertRaises(ValueError):
+            self.sm.transition(CaptureEvent.CAPTURE_SUCCESS)
+        self.assertEqual(len(self.sm.history), 0)
+
+    def test_transition_is_timestamped(self):
+        """Test transitions record monotonic timestamps and dwell times."""
+        self.sm.transition(CaptureEvent.START_CONNECT)
+        self.clock.now += 0.25
+        self.sm.transition(CaptureEvent.CONNECT_SUCCESS)
+
+        last = self.sm.history[-1]
+        self.assertEqual(last.from_state, CaptureState.CONNECTING)
+        self.assertEqual(last.to_state, CaptureState.CONNECTED)
+        self.assertEqual(last.timestamp, 100.25)
+        self.assertAlmostEqual(last.dwell_ms, 250.0)
+
+    def test_dwell_histograms_per_camera_and_state(self):
+        """Test dwell times are aggregated per (camera, state)."""
+        for _ in range(3):
+            self.sm.transition(CaptureEvent.START_CONNECT)
+            self.clock.now += 0.04
+            self.sm.transition(CaptureEvent.CONNECT_FAILURE)
+            self.sm.transition(CaptureEvent.RESET)
+
+        snapshot = self.histograms.snapshot()
+        connecting = snapshot["cam1/CONNECTING"]
+        self.assertEqual(connecting["count"], 3)
+        self.assertAlmostEqual(connecting["mean_ms"], 40.0)
+        self.assertAlmostEqual(connecting["p99_ms"], 40.0)
+        self.assertIn("cam1/CONNECTING: n=3", self.histograms.format())
+        json.dumps(snapshot)
+
+    def test_time_in_state(self):
+        """Test the dwell time of the current state."""
+        self.clock.now += 1.5
+        self.assertAlmostEqual(self.sm.time_in_state_ms(), 1500.0)
+
+if __name__ == '__main__':
+    unittest.main()
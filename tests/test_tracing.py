@@ -0,0 +1,68 @@
+import unittest
+import os
+import json
+import tempfile
+from src.utils.tracing import Tracer, JsonLinesSpanExporter
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up for the tests."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.trace_file = os.path.join(self.tmp_dir.name, "traces.jsonl")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.tmp_dir.cleanup()
+
+    def _read_spans(self):
+        with open(self.trace_file) as f:
+            return [json.loads(line) for line in f]
+
+    def test_span_outside_trace_is_noop(self):
+        """Test that spans outside of a trace record nothing."""
+        tracer = Tracer(JsonLinesSpanExporter(self.trace_file))
+        with tracer.span("connect") as span:
+            self.assertIsNone(span)
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    def test_spans_share_trace_id(self):
+        """Test nested spans are exported with one trace id and correct parents."""
+        tracer = Tracer(JsonLinesSpanExporter(self.trace_file))
+        with tracer.trace("capture", camera_id="cam1") as root:
+            with tracer.span("connect"):
+                pass
+            with tracer.span("encode"):
+                pass
+
+        spans = self._read_spans()
+        self.assertEqual([s["name"] for s in spans], ["connect", "encode", "capture"])
+        self.assertEqual({s["trace_id"] for s in spans}, {root.trace_id})
+        self.assertEqual(spans[0]["parent_id"], root.span_id)
+        self.assertIsNone(spans[2]["parent_id"])
+
+    def test_error_status(self):
+        """Test that an exception marks the span as failed."""
+        tracer = Tracer(JsonLinesSpanExporter(self.trace_file))
+        with self.assertRaises(RuntimeError):
+            with tracer.trace("capture"):
+                with tracer.span("read"):
+                    raise RuntimeError("boom")
+        self.assertEqual({s["status"] for s in self._read_spans()}, {"error"})
+
+    def test_unsampled_traces_are_dropped(self):
+        """Test that head sampling drops traces."""
+        tracer = Tracer(JsonLinesSpanExporter(self.trace_file), sample_rate=0.0)
+        with tracer.trace("capture"):
+            pass
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    def test_slow_traces_are_always_exported(self):
+        """Test that traces over the slow threshold bypass sampling."""
+        tracer = Tracer(JsonLinesSpanExporter(self.trace_file), sample_rate=0.0, slow_trace_ms=0)
+        with tracer.trace("capture"):
+            pass
+        self.assertEqual(len(self._read_spans()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from src.camera.virtual_camera import VirtualCameraClient, virtual_client_factory
+from src.core.load_generator import run_load_test
+from src.models.camera_models import CameraConfig, VirtualCameraSpec
+from src.utils.tracing import tracer
+
+class TestVirtualCameraClient(unittest.TestCase):
+
+    def setUp(self):
+        """Set up for the tests."""
+        self.config = CameraConfig(ip="virtual", username="u", password="p", camera_id="virtual_0000")
+
+    def test_synthetic_frames(self):
+        """Test synthetic frames have the configured size and change over time."""
+        spec = VirtualCameraSpec(width=64, height=48, realtime=False)
+        with VirtualCameraClient(self.config, spec) as client:
+            first = client.capture_frame()
+            second = client.capture_frame()
+        self.assertEqual(first.shape, (48, 64, 3))
+        self.assertFalse(np.array_equal(first, second))
+        self.assertIsNone(client.cap)
+
+    def test_realtime_pacing(self):
+        """Test frames are delivered no faster than the configured fps."""
+        spec = VirtualCameraSpec(width=32, height=32, fps=50)
+        client = VirtualCameraClient(self.config, spec)
+        client.connect()
+        start = time.monotonic()
+        for _ in range(6):
+            client.capture_frame()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_slow_connect(self):
+        """Test the connect delay is applied."""
+        client = VirtualCameraClient(self.config, VirtualCameraSpec(connect_delay_ms=50))
+        start = time.monotonic()
+        self.assertTrue(client.connect())
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_auth_failure(self):
+        """Test auth failures make connect fail."""
+        client = VirtualCameraClient(self.config, VirtualCameraSpec(auth_failure_rate=1.0))
+        self.assertFalse(client.connect())
+        self.assertIsNone(client.capture_frame())
+
+    def test_dropped_stream(self):
+        """Test a dropped stream stays down until reconnect."""
+        client = VirtualCameraClient(self.config, VirtualCameraSpec(width=32, height=32, realtime=False, drop_rate=1.0))
+        client.connect()
+        self.assertIsNone(client.capture_frame())
+        self.assertIsNone(client.cap)
+
+    def test_corrupt_frames(self):
+        """Test corrupt frames keep their size but differ from the clean frame."""
+        spec = VirtualCameraSpec(width=32, height=32, realtime=False, seed=3)
+        clean = VirtualCameraClient(self.config, spec)
+        corrupt = VirtualCameraClient(self.config, VirtualCameraSpec(width=32, height=32, realtime=False,
+                                                                     corrupt_rate=1.0, seed=3))
+        clean.connect()
+        corrupt.connect()
+        expected, frame = clean.capture_frame(), corrupt.capture_frame()
+        self.assertEqual(frame.shape, (32, 32, 3))
+        self.assertFalse(np.array_equal(frame, expected))
+
+    def test_video_file_source_loops(self):
+        """Test a local video file is played and looped."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "clip.avi")
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+            if not writer.isOpened():
+                self.skipTest("No video writer backend available")
+            for value in range(3):
+                writer.write(np.full((24, 32, 3), value * 80, dtype=np.uint8))
+            writer.release()
+
+            client = VirtualCameraClient(self.config, VirtualCameraSpec(source=path, realtime=False))
+            self.assertTrue(client.connect())
+            frames = [client.capture_frame() for _ in range(5)]
+            client.disconnect()
+        self.assertTrue(all(frame is not None and frame.shape == (24, 32, 3) for frame in frames))
+
+    def test_factory_faults_are_reproducible_per_camera(self):
+        """Test fault streams depend on the seed, camera and connect count, not on call order."""
+        spec = VirtualCameraSpec(width=16, height=16, realtime=False, corrupt_rate=0.5, seed=7)
+        other = CameraConfig(ip="virtual", username="u", password="p", camera_id="virtual_0001")
+
+        def faults(factory, config):
+            client = factory(config)
+            client.connect()
+            return [client.capture_frame().tobytes() for _ in range(20)]
+
+        first_run = virtual_client_factory(spec)
+        expected = [faults(first_run, self.config), faults(first_run, self.config)]
+        second_run = virtual_client_factory(spec)
+        faults(second_run, other)
+        self.assertEqual([faults(second_run, self.config), faults(second_run, self.config)], expected)
+        self.assertNotEqual(expected[0], expected[1])
+
+    def test_capture_emits_read_span(self):
+        """Test captures emit a read span like RTSPClient."""
+        client = VirtualCameraClient(self.config, VirtualCameraSpec(width=16, height=16, realtime=False))
+        client.connect()
+        with tracer.trace("capture"):
+            client.capture_frame()
+            names = [span.name for span in tracer.current_spans()]
+        self.assertEqual(names, ["read"])
+
+class TestLoadGenerator(unittest.TestCase):
+
+    def test_run_load_test(self):
+        """Test a short load test drives the full capture path."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spec = VirtualCameraSpec(width=64, height=48, realtime=False, corrupt_rate=0.2, seed=1)
+            report = run_load_test(5, spec, duration_s=0.3, workers=2, output_dir=tmp_dir)
+            self.assertEqual(sorted(os.listdir(tmp_dir)), [f"virtual_{i:04d}" for i in range(5)])
+
+        self.assertGreater(report.successes, 0)
+        self.assertGreater(report.bytes_written, 0)
+        self.assertEqual(report.latency["count"], report.successes)
+        self.assertEqual(len(report.run_stats), report.captures)
+        self.assertFalse(np.isnan(report.run_stats.columns()["read_ms"]).all())
+        self.assertIn("captures/s", report.format())
+
+    def test_fps_bounds_throughput(self):
+        """Test reconnecting for every capture does not let a camera exceed its frame rate."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spec = VirtualCameraSpec(width=32, height=24, fps=5.0)
+            report = run_load_test(2, spec, duration_s=1.0, workers=2, output_dir=tmp_dir)
+
+        # One frame is available at the start, then one every 200 ms per camera.
+        self.assertGreater(report.captures, 0)
+        self.assertLessEqual(report.captures, 2 * (5 + 2))
+
+if __name__ == '__main__':
+    unittest.main()